@@ -1,113 +1,204 @@
+import os
 import sys
 import math
 import pygame
 
+from overworld.atlas import AnimatedLayer, TileAtlas
+from overworld.camera import Camera
+from overworld.chunks import ChunkedMap, array_source, scatter_source
+from overworld.dirty import DirtyRenderer
+from overworld.entities import EntityStore
+from overworld.loop import FixedStepLoop
+from overworld.lowres import LowResTarget
+from overworld.mapfile import MapWatcher, load_map
+from overworld.particles import ParticleSystem
+from overworld.pathfinding import Pathfinder
+from overworld.profiling import PHASES
+from overworld.sprites import Animator, SpriteSheet, placeholder_sheet, walk_table
+
 # Constants
-TILE_SIZE = 32
-LEVEL = [
-    "####################",
-    "#..................#",
-    "#..######..........#",
-    "#..................#",
-    "#...........####...#",
-    "#..................#",
-    "#..................#",
-    "####################",
-]
-
-WIDTH = len(LEVEL[0]) * TILE_SIZE
-HEIGHT = len(LEVEL) * TILE_SIZE
+DIRTY_RECTS = "--dirty-rects" in sys.argv  # only push changed regions
+LOW_RES = "--low-res" in sys.argv  # draw at 16 px/tile and upscale 2x
+TILE_SIZE = 16 if LOW_RES else 32
+BIG_WORLD = "--big-world" in sys.argv  # 4096x4096 generated map streamed in chunks
+VIEW_TILES = (20, 15)  # largest window, in tiles; bigger maps scroll
+CHUNK_SIZE = 32
+FPS = 60  # drawing cap; gameplay always ticks at TICK_RATE
+TICK_RATE = 120
+MAP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps", "demo.map")
+
+if BIG_WORLD:
+    MAP_WIDTH = MAP_HEIGHT = 4096
+    LOAD_CHUNK = scatter_source(
+        MAP_WIDTH, MAP_HEIGHT, CHUNK_SIZE, seed=1, keep_clear=pygame.Rect(1, 1, 4, 4)
+    )
+else:
+    LEVEL = load_map(MAP_PATH)
+    MAP_WIDTH, MAP_HEIGHT = LEVEL.width, LEVEL.height
+    LOAD_CHUNK = array_source(LEVEL.tiles, CHUNK_SIZE)
+
+WIDTH = min(MAP_WIDTH, VIEW_TILES[0]) * TILE_SIZE
+HEIGHT = min(MAP_HEIGHT, VIEW_TILES[1]) * TILE_SIZE
 
 # Initialize Pygame
 pygame.init()
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
+if LOW_RES:
+    TARGET = LowResTarget((WIDTH, HEIGHT), scale=32 // TILE_SIZE)
+    SCREEN = TARGET.surface
+else:
+    TARGET = None
+    SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Deltarune Overworld Demo")
 CLOCK = pygame.time.Clock()
+LOOP = FixedStepLoop(TICK_RATE)
 
 # Basic graphics
 WALL_IMG = pygame.Surface((TILE_SIZE, TILE_SIZE))
 WALL_IMG.fill((60, 60, 60))
 FLOOR_IMG = pygame.Surface((TILE_SIZE, TILE_SIZE))
 FLOOR_IMG.fill((10, 10, 40))
-PLAYER_IMG = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
-pygame.draw.circle(PLAYER_IMG, (255, 255, 0), (TILE_SIZE // 2, TILE_SIZE // 2), TILE_SIZE // 2)
+# Player walk cycle, sliced and mirrored once; ANIMS holds per-actor frame state
+PLAYER_SHEET = SpriteSheet(placeholder_sheet(TILE_SIZE, (255, 255, 0)), (TILE_SIZE, TILE_SIZE))
+ANIMS = Animator(walk_table(PLAYER_SHEET.columns))
+
+
+def water_frame(n, frames=4):
+    """Water tile with a ripple line that drifts down over ``frames`` steps."""
+    img = pygame.Surface((TILE_SIZE, TILE_SIZE))
+    img.fill((20, 50, 140))
+    for i in range(2):
+        y = (n * TILE_SIZE // frames + i * TILE_SIZE // 2) % TILE_SIZE
+        pygame.draw.line(img, (90, 140, 230), (TILE_SIZE // 8, y), (TILE_SIZE * 5 // 8, y))
+    return img
+
+
+WATER_FRAMES = [water_frame(n) for n in range(4)]
+
+# Animated tiles come from one atlas surface and are drawn with a single
+# blits() call; only tiles whose frame changed are rewritten in the batch
+ATLAS = TileAtlas(TILE_SIZE, {'~': WATER_FRAMES})
+ANIMATED = AnimatedLayer(ATLAS, {'~': 0.25})
 
-# Player setup
-player = PLAYER_IMG.get_rect()
-player.topleft = (TILE_SIZE * 2, TILE_SIZE * 2)
-SPEED = 160  # pixels per second
+# The map is kept as chunks around the camera; each chunk's tiles are
+# painted once and every frame blits only the chunks in view
+WORLD = ChunkedMap(
+    MAP_WIDTH, MAP_HEIGHT, LOAD_CHUNK, TILE_SIZE, {'#': WALL_IMG, '~': WATER_FRAMES[0]},
+    default=FLOOR_IMG, chunk_size=CHUNK_SIZE,
+)
+CAMERA = Camera((WIDTH, HEIGHT), WORLD.pixel_size)
+PATHS = Pathfinder(WORLD)  # click-to-move paths, cached until tiles change
+WATCHER = MapWatcher([] if BIG_WORLD else [MAP_PATH])
+RENDERER = DirtyRenderer(
+    SCREEN,
+    lambda screen, rect: WORLD.draw(screen, CAMERA, rect),
+    enabled=DIRTY_RECTS,
+    display=TARGET,
+)
 
-# Helper to check tile collisions
-def is_wall(px, py):
-    if 0 <= py < len(LEVEL) and 0 <= px < len(LEVEL[0]):
-        return LEVEL[py][px] == '#'
-    return True
+# Player setup: actors live in an array-backed store, the player is one entry
+ACTORS = EntityStore()
+PLAYER = ACTORS.spawn(TILE_SIZE * 2, TILE_SIZE * 2, TILE_SIZE, TILE_SIZE)
+player = ACTORS.rect(PLAYER)
+SPEED = 5 * TILE_SIZE  # pixels per second
 
-# Main loop
+# A burst marks where a click-to-move path leads
+EFFECTS = ParticleSystem(4096, gravity=(0, 2 * TILE_SIZE), drag=2.0)
+
+# Main loop: gameplay runs in fixed ticks, drawing interpolates between them
 running = True
-target_pos = None
+waypoints = []  # world-pixel tile centres left on the click-to-move path
+held = set()  # keys down, tracked from events so input can be scripted
 while running:
-    dt = CLOCK.tick(60) / 1000.0
+    frame_time = CLOCK.tick(FPS) / 1000.0
+    PHASES.begin()
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == pygame.KEYDOWN:
+            held.add(event.key)
+        elif event.type == pygame.KEYUP:
+            held.discard(event.key)
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            target_pos = event.pos
-
-    keys = pygame.key.get_pressed()
-    dx = dy = 0
-    if target_pos:
-        cx, cy = player.center
-        tx, ty = target_pos
-        vec_x = tx - cx
-        vec_y = ty - cy
-        dist = math.hypot(vec_x, vec_y)
-        if dist > 1:
-            dx = (vec_x / dist) * SPEED * dt
-            dy = (vec_y / dist) * SPEED * dt
+            gx, gy = CAMERA.to_world(TARGET.to_native(event.pos) if TARGET else event.pos)
+            path = PATHS.find(
+                (player.centerx // TILE_SIZE, player.centery // TILE_SIZE),
+                (gx // TILE_SIZE, gy // TILE_SIZE),
+            )
+            waypoints = [
+                (x * TILE_SIZE + TILE_SIZE // 2, y * TILE_SIZE + TILE_SIZE // 2)
+                for x, y in path or ()
+            ]
+            if waypoints:
+                EFFECTS.emit(80, waypoints[-1], speed=(20, 120), life=(0.4, 0.9), color=(255, 220, 80))
+
+    # Hot-reload the map when its file is edited
+    for path in WATCHER.poll(pygame.time.get_ticks() / 1000.0):
+        try:
+            LEVEL = load_map(path)
+        except (OSError, ValueError) as e:  # half-saved edit; keep playing the old map
+            print(f"map reload failed: {e}", file=sys.stderr)
+            continue
+        WORLD.reset(LEVEL.width, LEVEL.height, array_source(LEVEL.tiles, CHUNK_SIZE))
+        CAMERA.world_size = WORLD.pixel_size
+        RENDERER.invalidate()
+    PHASES.mark('events')
+
+    for _ in range(LOOP.advance(frame_time)):
+        dt = LOOP.dt
+        vx = vy = 0
+        if waypoints:
+            cx, cy = ACTORS.centers(PLAYER)
+            tx, ty = waypoints[0]
+            vec_x = tx - cx
+            vec_y = ty - cy
+            dist = math.hypot(vec_x, vec_y)
+            if dist <= SPEED * dt:
+                ACTORS.pos[PLAYER] = (tx - TILE_SIZE / 2, ty - TILE_SIZE / 2)
+                waypoints.pop(0)
+            else:
+                vx = (vec_x / dist) * SPEED
+                vy = (vec_y / dist) * SPEED
         else:
-            target_pos = None
-    else:
-        if keys[pygame.K_LEFT]:
-            dx = -SPEED * dt
-        if keys[pygame.K_RIGHT]:
-            dx = SPEED * dt
-        if keys[pygame.K_UP]:
-            dy = -SPEED * dt
-        if keys[pygame.K_DOWN]:
-            dy = SPEED * dt
-
-    # Attempt horizontal movement
-    new_rect = player.move(dx, 0)
-    if not (
-        is_wall(new_rect.left // TILE_SIZE, new_rect.top // TILE_SIZE) or
-        is_wall(new_rect.right // TILE_SIZE, new_rect.top // TILE_SIZE) or
-        is_wall(new_rect.left // TILE_SIZE, new_rect.bottom // TILE_SIZE) or
-        is_wall(new_rect.right // TILE_SIZE, new_rect.bottom // TILE_SIZE)
-    ):
-        player = new_rect
-
-    # Attempt vertical movement
-    new_rect = player.move(0, dy)
-    if not (
-        is_wall(new_rect.left // TILE_SIZE, new_rect.top // TILE_SIZE) or
-        is_wall(new_rect.right // TILE_SIZE, new_rect.top // TILE_SIZE) or
-        is_wall(new_rect.left // TILE_SIZE, new_rect.bottom // TILE_SIZE) or
-        is_wall(new_rect.right // TILE_SIZE, new_rect.bottom // TILE_SIZE)
-    ):
-        player = new_rect
+            if pygame.K_LEFT in held:
+                vx = -SPEED
+            if pygame.K_RIGHT in held:
+                vx = SPEED
+            if pygame.K_UP in held:
+                vy = -SPEED
+            if pygame.K_DOWN in held:
+                vy = SPEED
+        ACTORS.vel[PLAYER] = (vx, vy)
+        ANIMS.face(PLAYER, ACTORS.vel[PLAYER])
+        ANIMS.update(dt)
+        EFFECTS.update(dt)
+        PHASES.mark('movement')
+
+        # Move every actor in one batched pass, stopping flush against walls
+        ACTORS.integrate(dt, WORLD)
+        if waypoints and ACTORS.blocked[PLAYER]:
+            waypoints = []  # snagged on a corner getting onto the path; give up
+        player = ACTORS.rect(PLAYER)
+        PHASES.mark('collision')
+
+    # Scroll to where the player is drawn, then stream chunks in/out around the view
+    shown = ACTORS.lerp_rect(PLAYER, LOOP.alpha)
+    if CAMERA.follow(shown):
+        RENDERER.invalidate()
+    if WORLD.update(CAMERA):
+        ANIMATED.set_tiles(WORLD.find('~'))
+    PHASES.mark('streaming')
 
     # Drawing
-    SCREEN.fill((0, 0, 0))
-    for y, row in enumerate(LEVEL):
-        for x, ch in enumerate(row):
-            pos = (x * TILE_SIZE, y * TILE_SIZE)
-            if ch == '#':
-                SCREEN.blit(WALL_IMG, pos)
-            else:
-                SCREEN.blit(FLOOR_IMG, pos)
-    SCREEN.blit(PLAYER_IMG, player)
-    pygame.display.flip()
+    changed = ANIMATED.update(LOOP.ticks * LOOP.dt)
+    RENDERER.begin()
+    for rect in ANIMATED.draw(SCREEN, CAMERA, changed):
+        RENDERER.track(rect)
+    RENDERER.blits(ANIMS.blit_list(PLAYER_SHEET, PLAYER, CAMERA.to_screen(shown).topleft))
+    dirty = EFFECTS.draw(SCREEN, CAMERA.offset)
+    if dirty:
+        RENDERER.track(dirty)
+    RENDERER.present()
+    PHASES.mark('drawing')
 
 pygame.quit()
 sys.exit()
@@ -1,161 +1,317 @@
+import glob
+import os
 import sys
 import pygame
 
+from overworld.camera import Camera
+from overworld.dirty import DirtyRenderer
+from overworld.entities import EntityStore
+from overworld.flowfield import CHASE, FLEE, steer
+from overworld.interact import TileTracker
+from overworld.loop import FixedStepLoop
+from overworld.lowres import LowResTarget
+from overworld.mapfile import MapWatcher
+from overworld.particles import ParticleSystem
+from overworld.profiling import PHASES
+from overworld.rooms import RoomManager
+from overworld.savestate import SaveState, SaveWriter
+from overworld.scheduler import WorldScheduler
+from overworld.sprites import Animator, SpriteSheet, placeholder_sheet, walk_table
+from overworld.text import DialogueBox, load_font
+
 # Constants
-TILE_SIZE = 32
+DIRTY_RECTS = "--dirty-rects" in sys.argv  # only push changed regions
+LOW_RES = "--low-res" in sys.argv  # draw at 16 px/tile and upscale 2x
+TILE_SIZE = 16 if LOW_RES else 32
+VIEW_TILES = (20, 15)  # largest window, in tiles; bigger rooms scroll
+FPS = 60  # drawing cap; gameplay always ticks at TICK_RATE
+TICK_RATE = 120
 
 # Rooms mimic a handful of locations from Chapter 1.  They are
-# intentionally tiny and only hint at the real maps.
-ROOMS = {
-    "classroom": [
-        "####################",
-        "#.......D..........#",
-        "#..................#",
-        "#....N.............#",
-        "#..................#",
-        "#..................#",
-        "#..................#",
-        "####################",
-    ],
-    "dark_room": [
-        "####################",
-        "#..................#",
-        "#....######........#",
-        "#..............D...#",
-        "#.....N............#",
-        "#..................#",
-        "#..................#",
-        "####################",
-    ],
-}
-current_room = "classroom"
-
-def get_level():
-    return ROOMS[current_room]
+# intentionally tiny and only hint at the real maps.  Built rooms
+# (background, collision grid, doors) are cached and the rooms behind
+# a room's doors are prefetched in the background.
+MAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps")
+ROOMS = RoomManager(MAP_DIR, TILE_SIZE, {'#': (60, 60, 60), 'D': (0, 0, 255)}, default=(40, 40, 56))
+ROOM = ROOMS.enter("classroom")
 
-WIDTH = len(get_level()[0]) * TILE_SIZE
-HEIGHT = len(get_level()) * TILE_SIZE
+WIDTH = min(ROOM.grid.width, VIEW_TILES[0]) * TILE_SIZE
+HEIGHT = min(ROOM.grid.height, VIEW_TILES[1]) * TILE_SIZE
 
 # Initialize Pygame
 pygame.init()
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
+if LOW_RES:
+    TARGET = LowResTarget((WIDTH, HEIGHT), scale=32 // TILE_SIZE)
+    SCREEN = TARGET.surface
+else:
+    TARGET = None
+    SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Deltarune Overworld Demo")
 CLOCK = pygame.time.Clock()
+LOOP = FixedStepLoop(TICK_RATE)
 
-# Message UI
-FONT = pygame.font.SysFont("Arial", 20)
-message = None
-message_timer = 0.0
+# One display surface for the whole session; rooms are viewed through the camera
+CAMERA = Camera((WIDTH, HEIGHT), ROOM.pixel_size)
+RENDERER = DirtyRenderer(
+    SCREEN,
+    lambda screen, rect: ROOM.background.draw_view(screen, rect, CAMERA.offset),
+    enabled=DIRTY_RECTS,
+    display=TARGET,
+)
 
-# Player setup
-player = pygame.Rect(
-    TILE_SIZE * 2, TILE_SIZE * 2, TILE_SIZE // 2, TILE_SIZE // 2
+# Message UI
+FONT = load_font("Arial", 10 if LOW_RES else 20)  # resolved once, then remembered across runs
+DIALOGUE = {
+    "greeting": "Hi there!",
+    "whisper": "...did you hear that?",
+    "cold_draft": "A cold draft blows through the room.",
+    "bell": "The school bell rings.",
+    "drip": "Drip... drip...",
+}
+# Lines are rendered once and revealed typewriter-style
+MESSAGE_BOX = DialogueBox(
+    FONT, pygame.Rect(0, HEIGHT - 2 * TILE_SIZE, WIDTH, 2 * TILE_SIZE).inflate(-TILE_SIZE // 2, -TILE_SIZE // 2)
 )
-PLAYER_COLOR = (255, 255, 0)
-SPEED = 160  # pixels per second
 
-# Helper to check tile collisions
-def is_wall(px, py):
-    level = get_level()
-    if 0 <= py < len(level) and 0 <= px < len(level[0]):
-        return level[py][px] in ('#', 'N')
-    return True
+# Player and crowd share one array-backed actor store
+ACTORS = EntityStore()
+PLAYER_SIZE = TILE_SIZE // 2
+SPEED = 5 * TILE_SIZE  # pixels per second
+
+# Moving NPCs chase or flee the player along the room's shared flow field
+CROWD_SIZE = TILE_SIZE // 2 - 4
+CROWD_SPEED = 2.8 * TILE_SIZE  # pixels per second
+
+# Sprite sheets are sliced (and mirrored) once; each actor only carries an
+# animation id, clock and flip bit in ANIMS
+PLAYER_SHEET = SpriteSheet(placeholder_sheet(PLAYER_SIZE, (255, 255, 0)), (PLAYER_SIZE, PLAYER_SIZE))
+CROWD_SHEETS = {
+    mode: SpriteSheet(placeholder_sheet(CROWD_SIZE, color), (CROWD_SIZE, CROWD_SIZE))
+    for mode, color in ((CHASE, (150, 40, 200)), (FLEE, (80, 200, 120)))
+}
+ANIMS = Animator(walk_table(PLAYER_SHEET.columns))
+
+# Footstep dust and trigger sparkles
+EFFECTS = ParticleSystem(4096, drag=3.0)
+DUST_EVERY = TICK_RATE // 10  # ticks between dust puffs while walking
+
+# In dark rooms the player carries a lantern
+LANTERN = (4, (255, 230, 180))  # radius in tiles, colour
+
+
+# Rooms keep living after the player leaves: neighbours of the current room
+# tick at a low rate, the rest are frozen and caught up when next in range
+SCHEDULER = WorldScheduler(CROWD_SIZE, CROWD_SPEED)
+
+
+def populate(room, player_pos):
+    """Reset the actors for ``room``: the player at ``player_pos`` plus its crowd.
+
+    The crowd comes from the scheduler, which remembers where it was left
+    (call ``SCHEDULER.leave`` first).  The crowd's mode (CHASE/FLEE) is
+    kept in the entity tag.
+    """
+    ACTORS.clear()
+    player_id = ACTORS.spawn(player_pos[0], player_pos[1], PLAYER_SIZE, PLAYER_SIZE)
+    return player_id, SCHEDULER.enter(room, ACTORS)
 
-# Main loop
+
+def snapshot():
+    """The current game as a SaveState."""
+    message = MESSAGE_BOX.text if MESSAGE_BOX.open else None
+    return SaveState(ROOM.name, LOOP.ticks, PLAYER, ACTORS.snapshot(), message)
+
+
+def restore(state):
+    """Load ``state`` into the actors, tick count and message box; returns (room, player id, crowd ids)."""
+    room = ROOMS.enter(state.room)
+    LOOP.ticks = state.tick
+    SCHEDULER.leave(ACTORS, CROWD)
+    SCHEDULER.enter(room)
+    ACTORS.restore(state.entities)
+    ids = state.entities['ids'].astype(int)
+    EFFECTS.clear()
+    if state.message:
+        MESSAGE_BOX.show(state.message)
+        MESSAGE_BOX.skip()
+    else:
+        MESSAGE_BOX.close()
+    return room, state.player, ids[ids != state.player]
+
+
+# F5 quicksaves, F9 quickloads, F10 loads the latest autosave; autosaves rotate through a few slots.
+# Saves are written on a background thread.
+SAVES = SaveWriter(os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves"))
+AUTOSAVE_EVERY = 30 * TICK_RATE  # ticks
+
+PLAYER, CROWD = populate(ROOM, (TILE_SIZE * 2, TILE_SIZE * 2))
+player = ACTORS.rect(PLAYER)
+
+CAMERA.follow(player)
+TRACKER = TileTracker(ROOM.interactables)
+WATCHER = MapWatcher(glob.glob(os.path.join(MAP_DIR, "*.map")))
+
+# Main loop: gameplay runs in fixed ticks, drawing interpolates between them
 running = True
+held = set()  # keys down, tracked from events so input can be scripted
+next_autosave = AUTOSAVE_EVERY
 while running:
-    dt = CLOCK.tick(60) / 1000.0
+    frame_time = CLOCK.tick(FPS) / 1000.0
+    PHASES.begin()
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == pygame.KEYUP:
+            held.discard(event.key)
+        elif event.type == pygame.KEYDOWN:
+            held.add(event.key)
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+            SAVES.save(snapshot(), "quick")
+            MESSAGE_BOX.show("Game saved.")
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_F9, pygame.K_F10):
+            if event.key == pygame.K_F9:
+                state, missing = SAVES.load("quick"), "No quicksave yet."
+            else:
+                state, missing = SAVES.latest_autosave(), "No autosave yet."
+            if state is None:
+                MESSAGE_BOX.show(missing)
+                continue
+            try:
+                ROOM, PLAYER, CROWD = restore(state)
+            except (OSError, ValueError) as e:  # the saved room's map is broken
+                print(f"map load failed: {e}", file=sys.stderr)
+                MESSAGE_BOX.show(f"Could not load {state.room}.map")
+                continue
+            next_autosave = LOOP.ticks + AUTOSAVE_EVERY
+            player = ACTORS.rect(PLAYER)
+            TRACKER.reset(ROOM.interactables, (player.centerx // TILE_SIZE, player.centery // TILE_SIZE))
+            CAMERA.world_size = ROOM.pixel_size
+            RENDERER.invalidate()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_z:
+            if MESSAGE_BOX.open and not MESSAGE_BOX.done:
+                MESSAGE_BOX.skip()
+                continue
+            # Talk to an NPC standing next to the player
+            cx = player.centerx // TILE_SIZE
+            cy = player.centery // TILE_SIZE
+            for item in ROOM.interactables.near(cx, cy):
+                if item.kind == 'npc':
+                    MESSAGE_BOX.show(DIALOGUE.get(item.data, item.data))
+                    break
+
+    # Hot-reload rooms whose map file was edited
+    for path in WATCHER.poll(pygame.time.get_ticks() / 1000.0):
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            room = ROOMS.reload(name)
+        except (OSError, ValueError) as e:  # half-saved edit; keep playing the old room
+            print(f"map reload failed: {e}", file=sys.stderr)
+            MESSAGE_BOX.show(f"Could not reload {name}.map")
+            continue
+        SCHEDULER.leave(ACTORS, CROWD)
+        SCHEDULER.forget(name)
+        ROOM = room
+        TRACKER.reset(ROOM.interactables, TRACKER.tile)
+        PLAYER, CROWD = populate(ROOM, player.topleft)
+        CAMERA.world_size = ROOM.pixel_size
+        RENDERER.invalidate()
+    PHASES.mark('events')
+
+    steps = LOOP.advance(frame_time)
+    for tick in range(LOOP.ticks - steps + 1, LOOP.ticks + 1):  # number of each tick run
+        dt = LOOP.dt
+        vx = vy = 0
+        if pygame.K_LEFT in held:
+            vx = -SPEED
+        if pygame.K_RIGHT in held:
+            vx = SPEED
+        if pygame.K_UP in held:
+            vy = -SPEED
+        if pygame.K_DOWN in held:
+            vy = SPEED
+        ACTORS.vel[PLAYER] = (vx, vy)
+        ANIMS.face(PLAYER, ACTORS.vel[PLAYER])
+        if (vx or vy) and tick % DUST_EVERY == 0:
+            EFFECTS.emit(3, player.midbottom, speed=(5, 25), life=(0.3, 0.6), color=(120, 110, 90))
+        if len(CROWD):
+            ACTORS.vel[CROWD] = steer(
+                ROOM.field, ACTORS.centers(CROWD), ACTORS.tag[CROWD], CROWD_SPEED, player.center
+            )
+            ANIMS.face(CROWD, ACTORS.vel[CROWD])
+        PHASES.mark('movement')
+
+        # Move every actor in one batched pass, stopping flush against walls
+        ACTORS.integrate(dt, ROOM.grid)
+        player = ACTORS.rect(PLAYER)
+        PHASES.mark('collision')
+
+        # Doors and triggers fire when the player steps onto their tile
+        tile = (player.centerx // TILE_SIZE, player.centery // TILE_SIZE)
+        for event, item in TRACKER.update(tile):
+            if event != 'enter':
+                continue
+            if item.kind == 'door':
+                name, (sx, sy) = item.data
+                try:
+                    room = ROOMS.enter(name)
+                except (OSError, ValueError) as e:  # broken map behind the door; stay here
+                    print(f"map load failed: {e}", file=sys.stderr)
+                    MESSAGE_BOX.show(f"Could not load {name}.map")
+                    break
+                SCHEDULER.leave(ACTORS, CROWD)
+                ROOM = room
+                PLAYER, CROWD = populate(ROOM, (sx * TILE_SIZE, sy * TILE_SIZE))
+                player = ACTORS.rect(PLAYER)
+                tile = (player.centerx // TILE_SIZE, player.centery // TILE_SIZE)
+                TRACKER.reset(ROOM.interactables, tile)
+                CAMERA.world_size = ROOM.pixel_size
+                RENDERER.invalidate()
+                EFFECTS.clear()
+                break
+            if item.kind == 'trigger':
+                MESSAGE_BOX.show(DIALOGUE.get(item.data, item.data))
+                centre = ((item.x + 0.5) * TILE_SIZE, (item.y + 0.5) * TILE_SIZE)
+                EFFECTS.emit(60, centre, speed=(20, 90), life=(0.5, 1.2), color=(140, 180, 255))
+        PHASES.mark('doors')
+
+        # Crowd field: rebuilt only when the player changes tile
+        ROOM.field.update(tile)
+
+        # Room timers; nearby rooms run at a lower rate in here too
+        for room_name, timer, _ in SCHEDULER.tick(dt):
+            if room_name == ROOM.name:
+                MESSAGE_BOX.show(DIALOGUE.get(timer, timer))
+
+        MESSAGE_BOX.update(dt)
+        EFFECTS.update(dt)
+        ANIMS.update(dt)
+        PHASES.mark('world')
+
+    if LOOP.ticks >= next_autosave:
+        SAVES.autosave(snapshot())
+        next_autosave = LOOP.ticks + AUTOSAVE_EVERY
 
-    keys = pygame.key.get_pressed()
-    dx = dy = 0
-    if keys[pygame.K_LEFT]:
-        dx = -SPEED * dt
-    if keys[pygame.K_RIGHT]:
-        dx = SPEED * dt
-    if keys[pygame.K_UP]:
-        dy = -SPEED * dt
-    if keys[pygame.K_DOWN]:
-        dy = SPEED * dt
-
-    if keys[pygame.K_z]:
-        cx = player.centerx // TILE_SIZE
-        cy = player.centery // TILE_SIZE
-        level = get_level()
-        if 0 <= cy < len(level) and 0 <= cx < len(level[0]):
-            if level[cy][cx] == 'N':
-                message = "Hi there!"
-                message_timer = 2.0
-
-    # Attempt horizontal movement
-    new_rect = player.move(dx, 0)
-    if not (
-        is_wall(new_rect.left // TILE_SIZE, new_rect.top // TILE_SIZE) or
-        is_wall(new_rect.right // TILE_SIZE, new_rect.top // TILE_SIZE) or
-        is_wall(new_rect.left // TILE_SIZE, new_rect.bottom // TILE_SIZE) or
-        is_wall(new_rect.right // TILE_SIZE, new_rect.bottom // TILE_SIZE)
-    ):
-        player = new_rect
-
-    # Attempt vertical movement
-    new_rect = player.move(0, dy)
-    if not (
-        is_wall(new_rect.left // TILE_SIZE, new_rect.top // TILE_SIZE) or
-        is_wall(new_rect.right // TILE_SIZE, new_rect.top // TILE_SIZE) or
-        is_wall(new_rect.left // TILE_SIZE, new_rect.bottom // TILE_SIZE) or
-        is_wall(new_rect.right // TILE_SIZE, new_rect.bottom // TILE_SIZE)
-    ):
-        player = new_rect
-
-    # Door transition: if standing on 'D', move to the other room
-    cx = player.centerx // TILE_SIZE
-    cy = player.centery // TILE_SIZE
-    level = get_level()
-    if 0 <= cy < len(level) and 0 <= cx < len(level[0]):
-        if level[cy][cx] == 'D' and current_room == "classroom":
-            current_room = "dark_room"
-            WIDTH = len(get_level()[0]) * TILE_SIZE
-            HEIGHT = len(get_level()) * TILE_SIZE
-            SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-            player.x, player.y = TILE_SIZE * 2, TILE_SIZE * 2
-        elif level[cy][cx] == 'D' and current_room == "dark_room":
-            current_room = "classroom"
-            WIDTH = len(get_level()[0]) * TILE_SIZE
-            HEIGHT = len(get_level()) * TILE_SIZE
-            SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-            player.x, player.y = TILE_SIZE * 7, TILE_SIZE * 2
-
-    # Update message timer
-    if message_timer > 0:
-        message_timer -= dt
-        if message_timer <= 0:
-            message_timer = 0
-            message = None
-
-    # Drawing
-    SCREEN.fill((0, 0, 0))
-    for y, row in enumerate(get_level()):
-        for x, ch in enumerate(row):
-            if ch == '#':
-                pygame.draw.rect(
-                    SCREEN,
-                    (60, 60, 60),
-                    (x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE),
-                )
-            elif ch == 'D':
-                pygame.draw.rect(
-                    SCREEN,
-                    (0, 0, 255),
-                    (x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE),
-                )
-    pygame.draw.rect(SCREEN, PLAYER_COLOR, player)
-    if message:
-        text_surf = FONT.render(message, True, (255, 255, 255))
-        text_rect = text_surf.get_rect(center=(WIDTH // 2, HEIGHT - 20))
-        SCREEN.blit(text_surf, text_rect)
-    pygame.display.flip()
+    # Drawing, with actors placed between the last two ticks
+    shown = ACTORS.lerp_rect(PLAYER, LOOP.alpha)
+    if CAMERA.follow(shown) or ROOM.lighting is not None:
+        RENDERER.invalidate()  # the light layer covers the whole view
+    RENDERER.begin()
+    crowd_pos = ACTORS.lerp(CROWD, LOOP.alpha) - CAMERA.offset
+    for mode, sheet in CROWD_SHEETS.items():
+        group = ACTORS.tag[CROWD] == mode
+        RENDERER.blits(ANIMS.blit_list(sheet, CROWD[group], crowd_pos[group]))
+    RENDERER.blits(ANIMS.blit_list(PLAYER_SHEET, PLAYER, CAMERA.to_screen(shown).topleft))
+    dirty = EFFECTS.draw(SCREEN, CAMERA.offset)
+    if dirty:
+        RENDERER.track(dirty)
+    if ROOM.lighting is not None:
+        lantern = (shown.centerx // TILE_SIZE, shown.centery // TILE_SIZE) + LANTERN
+        ROOM.lighting.apply(SCREEN, CAMERA, ROOM.ambient, ROOM.lights + [lantern])
+    MESSAGE_BOX.draw(RENDERER)
+    RENDERER.present()
+    PHASES.mark('drawing')
 
+ROOMS.close()
+SAVES.close()
 pygame.quit()
 sys.exit()
@@ -0,0 +1 @@
+"""Shared building blocks for the overworld demos (a.py, CreatYOUROWNKRISV0.py)."""
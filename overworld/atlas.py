@@ -0,0 +1,101 @@
+"""Tile atlas and batched drawing for animated tile layers.
+
+Static tiles are baked into room and chunk backgrounds.  Tiles that
+change over time (water, opening doors) are drawn on top from a single
+atlas surface.  The whole layer goes out in one ``Surface.blits`` call,
+and its (surface, dest, area) sequence is built once.  Afterwards only the
+entries whose animation frame changed are rewritten.
+"""
+import pygame
+
+
+class TileAtlas:
+    """Every frame of every tile packed into one surface.
+
+    ``tiles`` maps a tile character to a list of frames, each a Surface or
+    an RGB colour.  ``area(ch, frame)`` is the frame's Rect in ``surface``.
+    """
+
+    def __init__(self, tile_size, tiles):
+        self.tile_size = tile_size
+        count = sum(len(frames) for frames in tiles.values())
+        self.surface = pygame.Surface((max(1, count) * tile_size, tile_size), pygame.SRCALPHA)
+        self._areas = {}
+        slot = 0
+        for ch, frames in tiles.items():
+            areas = []
+            for look in frames:
+                area = pygame.Rect(slot * tile_size, 0, tile_size, tile_size)
+                if isinstance(look, pygame.Surface):
+                    self.surface.blit(look, area)
+                else:
+                    self.surface.fill(look, area)
+                areas.append(area)
+                slot += 1
+            self._areas[ch] = areas
+
+    def frames(self, ch):
+        return len(self._areas[ch])
+
+    def area(self, ch, frame=0):
+        return self._areas[ch][frame]
+
+
+class AnimatedLayer:
+    """Animated tiles of a room drawn with a single ``blits`` call.
+
+    ``durations`` maps a tile character in the atlas to seconds per frame.
+    Neighbouring tiles start at different frames so a pool of water does
+    not pulse in lockstep.
+    """
+
+    def __init__(self, atlas, durations):
+        self.atlas = atlas
+        self.durations = durations
+        self._tiles = []     # (tx, ty, ch, phase)
+        self._groups = {}    # ch -> indices into _tiles / _seq
+        self._frame = {}     # ch -> current global frame
+        self._seq = []       # [(surface, dest, area)] in screen space
+        self._offset = None
+
+    def set_tiles(self, tiles):
+        """Replace the layer's tiles with ``(tx, ty, ch)`` triples."""
+        self._tiles = [
+            (tx, ty, ch, (tx * 7 + ty * 3) % self.atlas.frames(ch))
+            for tx, ty, ch in tiles if ch in self.durations
+        ]
+        self._groups = {}
+        for i, (_, _, ch, _) in enumerate(self._tiles):
+            self._groups.setdefault(ch, []).append(i)
+        self._offset = None
+
+    def _area(self, i):
+        _, _, ch, phase = self._tiles[i]
+        return self.atlas.area(ch, (self._frame.get(ch, 0) + phase) % self.atlas.frames(ch))
+
+    def update(self, now):
+        """Advance animations to time ``now``; returns the indices of changed tiles."""
+        changed = []
+        for ch, group in self._groups.items():
+            frame = int(now / self.durations[ch])
+            if self._frame.get(ch) != frame:
+                self._frame[ch] = frame
+                changed += group
+        if self._offset is not None:
+            for i in changed:
+                surface, dest, _ = self._seq[i]
+                self._seq[i] = (surface, dest, self._area(i))
+        return changed
+
+    def draw(self, screen, camera, changed=()):
+        """Blit the layer; returns the screen Rects of ``changed`` tiles (for dirty rects)."""
+        ts = self.atlas.tile_size
+        if self._offset != camera.offset:
+            ox, oy = self._offset = camera.offset
+            surface = self.atlas.surface
+            self._seq = [
+                (surface, (tx * ts - ox, ty * ts - oy), self._area(i))
+                for i, (tx, ty, _, _) in enumerate(self._tiles)
+            ]
+        screen.blits(self._seq, doreturn=False)
+        return [pygame.Rect(self._seq[i][1], (ts, ts)) for i in changed]
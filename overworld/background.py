@@ -0,0 +1,62 @@
+import pygame
+
+
+class RoomBackground:
+    """Static tiles of a room rendered once into a single Surface.
+
+    ``tiles`` maps a tile character to either a Surface or an RGB colour.
+    Characters not in ``tiles`` are painted with ``default`` (a Surface,
+    a colour, or None to leave the ``fill`` colour showing).
+    """
+
+    def __init__(self, level, tile_size, tiles, default=None, fill=(0, 0, 0)):
+        self.tile_size = tile_size
+        self.tiles = tiles
+        self.default = default
+        self.fill = fill
+        self.level = [list(row) for row in level]
+        self.surface = pygame.Surface(
+            (len(self.level[0]) * tile_size, len(self.level) * tile_size)
+        )
+        self.rebuild()
+
+    def _paint(self, x, y, ch):
+        pos = (x * self.tile_size, y * self.tile_size)
+        self.surface.fill(self.fill, (pos, (self.tile_size, self.tile_size)))
+        look = self.tiles.get(ch, self.default)
+        if look is None:
+            return
+        if isinstance(look, pygame.Surface):
+            self.surface.blit(look, pos)
+        else:
+            self.surface.fill(look, (pos, (self.tile_size, self.tile_size)))
+
+    def rebuild(self):
+        """Repaint every tile, e.g. after the room was reloaded."""
+        self.surface.fill(self.fill)
+        for y, row in enumerate(self.level):
+            for x, ch in enumerate(row):
+                self._paint(x, y, ch)
+
+    def set_tile(self, x, y, ch):
+        """Change one tile and repaint only that cell of the cache."""
+        if self.level[y][x] != ch:
+            self.level[y][x] = ch
+            self._paint(x, y, ch)
+
+    def draw(self, screen, dest=(0, 0), area=None):
+        """Blit the whole room (or ``area`` of it) in a single call."""
+        screen.blit(self.surface, dest, area)
+
+    def draw_view(self, screen, rect, offset):
+        """Paint screen ``rect`` of a view whose top-left is at world ``offset``.
+
+        Parts of the view outside the room show the ``fill`` colour.
+        """
+        view = pygame.Rect(rect).move(offset)
+        clip = view.clip(self.surface.get_rect())
+        if clip != view:
+            screen.fill(self.fill, rect)
+        if clip.width and clip.height:
+            screen.blit(self.surface, (clip.x - offset[0], clip.y - offset[1]), clip)
+
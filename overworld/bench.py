@@ -0,0 +1,141 @@
+"""Headless frame-time benchmark for the overworld demos.
+
+Runs a demo script with SDL's dummy video/audio drivers, feeds it a
+scripted input sequence and a fixed frame clock, and prints per-phase
+timing percentiles::
+
+    python -m overworld.bench a.py --frames 1200
+    python -m overworld.bench CreatYOUROWNKRISV0.py --input clicks -- --big-world
+
+An input sequence is a comma-separated list of steps, repeated until the
+run ends.  ``RIGHT*30`` holds a key (any ``pygame.K_`` name) for 30
+frames, ``z`` taps a key for one frame, ``click:X:Y`` clicks the left
+mouse button at a window position and ``wait*N`` idles for N frames.
+"""
+import argparse
+import os
+import runpy
+import sys
+
+INPUTS = {
+    'walk': 'RIGHT*60,DOWN*40,LEFT*60,UP*40,z,wait*10',
+    'doors': 'RIGHT*80,UP*40,wait*30,DOWN*20,LEFT*80,z,wait*20',
+    'clicks': 'click:500:100,wait*120,click:100:300,wait*120,click:300:200,wait*120',
+}
+
+
+def parse_input(text):
+    """Expand an input sequence into one list of events per frame."""
+    import pygame
+
+    frames = []
+    for step in filter(None, (s.strip() for s in text.split(','))):
+        name, _, count = step.partition('*')
+        count = int(count or 1)
+        if name == 'wait':
+            frames += [[]] * count
+        elif name.startswith('click:'):
+            _, x, y = name.split(':')
+            pos = (int(x), int(y))
+            frames.append([pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos)])
+            frames.append([pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=pos)])
+            frames += [[]] * (count - 1)
+        else:
+            key = getattr(pygame, 'K_' + name, None)
+            if key is None:
+                raise ValueError(f"unknown key {name!r} in input sequence")
+            frames.append([pygame.event.Event(pygame.KEYDOWN, key=key)])
+            frames += [[]] * (count - 1)
+            frames.append([pygame.event.Event(pygame.KEYUP, key=key)])
+    return frames or [[]]
+
+
+class ScriptedClock:
+    """Stand-in for ``pygame.time.Clock`` driving a benchmark run.
+
+    Every ``tick`` reports exactly one frame at the requested rate, so the
+    simulation is identical between runs, posts the next frame's scripted
+    events and ends the run with a QUIT after ``frames`` frames.
+    """
+
+    frames = 0
+    script = [[]]
+    count = 0
+
+    def __init__(self):
+        self._fps = 60
+
+    def tick(self, framerate=0):
+        import pygame
+
+        if framerate:
+            self._fps = framerate
+        cls = ScriptedClock
+        for event in cls.script[cls.count % len(cls.script)]:
+            pygame.event.post(event)
+        cls.count += 1
+        if cls.count >= cls.frames:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        return int(1000 / self._fps)
+
+    def get_fps(self):
+        return float(self._fps)
+
+
+def run(script, frames, inputs, args=()):
+    """Run ``script`` headless for ``frames`` frames; return the phase timer."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    import pygame
+
+    from overworld.profiling import PHASES
+
+    ScriptedClock.frames = frames
+    ScriptedClock.script = parse_input(inputs)
+    ScriptedClock.count = 0
+    pygame.time.Clock = ScriptedClock
+    PHASES.reset()
+    PHASES.enabled = True
+    path = os.path.abspath(script)
+    sys.path.insert(0, os.path.dirname(path))
+    old_argv = sys.argv
+    sys.argv = [path, *args]
+    try:
+        runpy.run_path(path, run_name='__main__')
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = old_argv
+        PHASES.enabled = False
+    return PHASES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('script', help="demo script to run (a.py or CreatYOUROWNKRISV0.py)")
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--input', default='walk',
+                        help=f"named sequence ({', '.join(INPUTS)}) or a sequence string")
+    parser.add_argument('--percentiles', default='50,90,99')
+    argv = sys.argv[1:] if argv is None else list(argv)
+    script_args = []
+    if '--' in argv:  # everything after -- goes to the demo script
+        split = argv.index('--')
+        argv, script_args = argv[:split], argv[split + 1:]
+    opts = parser.parse_args(argv)
+    percentiles = [float(p) for p in opts.percentiles.split(',')]
+
+    timer = run(opts.script, opts.frames, INPUTS.get(opts.input, opts.input), script_args)
+    table = timer.summary(percentiles)
+    if not table:
+        print("no frames recorded (does the script mark PHASES?)")
+        return 1
+    print(f"{opts.script}: {timer.frames} frames, times in ms")
+    print(f"{'phase':<12}" + ''.join(f"{'p%g' % p:>9}" for p in percentiles))
+    for phase, values in table.items():
+        print(f"{phase:<12}" + ''.join(f"{v:9.3f}" for v in values))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import pygame
+
+
+class Camera:
+    """Scrolling viewport over a world measured in pixels.
+
+    When the world is smaller than the view on an axis it is centred
+    instead of scrolled.
+    """
+
+    def __init__(self, view_size, world_size):
+        self.rect = pygame.Rect((0, 0), view_size)
+        self.world_size = world_size
+
+    @property
+    def offset(self):
+        return self.rect.topleft
+
+    def _clamp(self, pos, view, world):
+        if world <= view:
+            return (world - view) // 2
+        return max(0, min(pos, world - view))
+
+    def follow(self, target):
+        """Centre the view on ``target`` (a Rect), clamped to the world edges.
+
+        Returns True if the view moved.
+        """
+        old = self.rect.topleft
+        self.rect.x = self._clamp(target.centerx - self.rect.width // 2, self.rect.width, self.world_size[0])
+        self.rect.y = self._clamp(target.centery - self.rect.height // 2, self.rect.height, self.world_size[1])
+        return self.rect.topleft != old
+
+    def to_screen(self, rect):
+        return pygame.Rect(rect).move(-self.rect.x, -self.rect.y)
+
+    def to_world(self, pos):
+        return pos[0] + self.rect.x, pos[1] + self.rect.y
@@ -0,0 +1,212 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from overworld.background import RoomBackground
+from overworld.collision import SOLID, TILE_FLAGS, TileCollider, flag_table
+
+
+def array_source(tiles, chunk_size):
+    """Chunk loader that slices a (height, width) tile array.
+
+    The slice is copied, so ``tiles`` may be a memory map whose pages the
+    OS is free to drop once a chunk has been read.
+    """
+    def load(cx, cy):
+        y, x = cy * chunk_size, cx * chunk_size
+        return np.array(tiles[y:y + chunk_size, x:x + chunk_size], dtype=np.uint8)
+    return load
+
+
+def scatter_source(width, height, chunk_size, seed=0, density=0.06, keep_clear=None):
+    """Chunk loader that generates a walled world with scattered pillars.
+
+    Each chunk is derived only from ``seed`` and its coordinates, so chunks
+    can be evicted and regenerated identically.  ``keep_clear`` is an
+    optional tile Rect (e.g. the spawn point) that never gets pillars.
+    """
+    floor, wall = ord('.'), ord('#')
+
+    def load(cx, cy):
+        y0, x0 = cy * chunk_size, cx * chunk_size
+        h, w = min(chunk_size, height - y0), min(chunk_size, width - x0)
+        rng = np.random.default_rng((seed, cx, cy))
+        tiles = np.where(rng.random((h, w)) < density, wall, floor).astype(np.uint8)
+        if keep_clear is not None:
+            clear = keep_clear.clip((x0, y0, w, h))
+            tiles[clear.top - y0:clear.bottom - y0, clear.left - x0:clear.right - x0] = floor
+        if y0 == 0:
+            tiles[0, :] = wall
+        if x0 == 0:
+            tiles[:, 0] = wall
+        if y0 + h == height:
+            tiles[-1, :] = wall
+        if x0 + w == width:
+            tiles[:, -1] = wall
+        return tiles
+    return load
+
+
+class _Chunk:
+    __slots__ = ('tiles', 'solid', 'background')
+
+    def __init__(self, tiles, table):
+        self.tiles = tiles
+        self.solid = (table[tiles] & SOLID).astype(bool)
+        self.background = None  # rendered on first draw
+
+
+class ChunkedMap(TileCollider):
+    """A large tile map held as square chunks around the camera.
+
+    ``load_chunk(cx, cy)`` returns the uint8 tile bytes of one chunk (edge
+    chunks may be smaller).  ``update(camera)`` keeps the chunks in and
+    around the view resident and evicts the rest, so memory use and draw
+    cost depend on the view size, not the map size.
+    """
+
+    def __init__(self, width, height, load_chunk, tile_size, tiles, default=None,
+                 fill=(0, 0, 0), chunk_size=32, margin=1, flags=TILE_FLAGS):
+        self.width = width
+        self.height = height
+        self.load_chunk = load_chunk
+        self.tile_size = tile_size
+        self.tiles = tiles
+        self.default = default
+        self.fill = fill
+        self.chunk_size = chunk_size
+        self.margin = margin
+        self.table = flag_table(flags)
+        self.version = 0  # bumped whenever a tile changes
+        self._chunks = OrderedDict()
+
+    def reset(self, width, height, load_chunk):
+        """Swap in new map contents (e.g. after a hot reload) and drop all chunks."""
+        self.width = width
+        self.height = height
+        self.load_chunk = load_chunk
+        self._chunks.clear()
+        self.version += 1
+
+    @property
+    def pixel_size(self):
+        return self.width * self.tile_size, self.height * self.tile_size
+
+    def chunk(self, cx, cy):
+        key = (cx, cy)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = self._chunks[key] = _Chunk(self.load_chunk(cx, cy), self.table)
+        return chunk
+
+    def _chunk_range(self, view, margin):
+        span = self.chunk_size * self.tile_size
+        last_x = (self.width - 1) // self.chunk_size
+        last_y = (self.height - 1) // self.chunk_size
+        return (
+            max(0, view.left // span - margin), max(0, view.top // span - margin),
+            min(last_x, (view.right - 1) // span + margin), min(last_y, (view.bottom - 1) // span + margin),
+        )
+
+    def update(self, camera):
+        """Load chunks around the view and evict those that fell out of range.
+
+        Returns True if the set of resident chunks changed.
+        """
+        x0, y0, x1, y1 = self._chunk_range(camera.rect, self.margin)
+        before = len(self._chunks)
+        for key in list(self._chunks):
+            if not (x0 <= key[0] <= x1 and y0 <= key[1] <= y1):
+                del self._chunks[key]
+        changed = len(self._chunks) != before
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                if (cx, cy) not in self._chunks:
+                    self.chunk(cx, cy)
+                    changed = True
+        return changed
+
+    def find(self, chars):
+        """``(tx, ty, ch)`` for every resident tile whose character is in ``chars``."""
+        codes = np.frombuffer(chars.encode('ascii'), dtype=np.uint8)
+        found = []
+        cs = self.chunk_size
+        for (cx, cy), chunk in self._chunks.items():
+            ys, xs = np.nonzero(np.isin(chunk.tiles, codes))
+            found += [
+                (cx * cs + x, cy * cs + y, chr(chunk.tiles[y, x]))
+                for x, y in zip(xs.tolist(), ys.tolist())
+            ]
+        return found
+
+    def draw(self, screen, camera, area=None):
+        """Blit the chunk backgrounds that overlap the view (or ``area`` of the screen)."""
+        view = camera.rect if area is None else pygame.Rect(area).move(camera.rect.topleft)
+        if area is None:
+            area = screen.get_rect()
+        screen.fill(self.fill, area)
+        x0, y0, x1, y1 = self._chunk_range(view, 0)
+        span = self.chunk_size * self.tile_size
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                chunk = self.chunk(cx, cy)
+                if chunk.background is None:
+                    rows = [bytes(row).decode('ascii') for row in chunk.tiles]
+                    chunk.background = RoomBackground(rows, self.tile_size, self.tiles, self.default, self.fill)
+                origin = pygame.Rect(cx * span, cy * span, span, span)
+                clip = origin.clip(view)
+                screen.blit(
+                    chunk.background.surface,
+                    (clip.x - camera.rect.x, clip.y - camera.rect.y),
+                    clip.move(-origin.x, -origin.y),
+                )
+
+    def set_tile(self, tx, ty, ch):
+        cs = self.chunk_size
+        chunk = self.chunk(tx // cs, ty // cs)
+        lx, ly = tx % cs, ty % cs
+        code = ord(ch)
+        if chunk.tiles[ly, lx] == code:
+            return
+        chunk.tiles[ly, lx] = code
+        chunk.solid[ly, lx] = self.table[code] & SOLID
+        if chunk.background is not None:
+            chunk.background.set_tile(lx, ly, ch)
+        self.version += 1
+
+    def tile_at(self, tx, ty):
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            cs = self.chunk_size
+            return chr(self.chunk(tx // cs, ty // cs).tiles[ty % cs, tx % cs])
+        return None
+
+    def flags_at(self, tx, ty):
+        ch = self.tile_at(tx, ty)
+        return SOLID if ch is None else int(self.table[ord(ch)])
+
+    def solid_at(self, tx, ty):
+        tx, ty = np.asarray(tx), np.asarray(ty)
+        tx, ty = np.broadcast_arrays(tx, ty)
+        out = np.ones(tx.shape, dtype=bool)
+        inside = (tx >= 0) & (tx < self.width) & (ty >= 0) & (ty < self.height)
+        cs = self.chunk_size
+        cx, cy = tx // cs, ty // cs
+        for key in set(zip(cx[inside].tolist(), cy[inside].tolist())):
+            sel = inside & (cx == key[0]) & (cy == key[1])
+            out[sel] = self.chunk(*key).solid[ty[sel] % cs, tx[sel] % cs]
+        return out if out.ndim else out[()]
+
+    def region_solid(self, tx0, ty0, tx1, ty1):
+        out = np.ones((max(0, ty1 - ty0 + 1), max(0, tx1 - tx0 + 1)), dtype=bool)
+        cs = self.chunk_size
+        x0, y0 = max(tx0, 0), max(ty0, 0)
+        x1, y1 = min(tx1, self.width - 1), min(ty1, self.height - 1)
+        for cy in range(y0 // cs, y1 // cs + 1) if y0 <= y1 else ():
+            for cx in range(x0 // cs, x1 // cs + 1) if x0 <= x1 else ():
+                solid = self.chunk(cx, cy).solid
+                ax0, ay0 = max(x0, cx * cs), max(y0, cy * cs)
+                ax1, ay1 = min(x1, cx * cs + cs - 1), min(y1, cy * cs + cs - 1)
+                out[ay0 - ty0:ay1 - ty0 + 1, ax0 - tx0:ax1 - tx0 + 1] = \
+                    solid[ay0 - cy * cs:ay1 - cy * cs + 1, ax0 - cx * cs:ax1 - cx * cs + 1]
+        return out
@@ -0,0 +1,78 @@
+import numpy as np
+
+# Tile flag bits
+SOLID = 1
+NPC = 2
+DOOR = 4
+
+TILE_FLAGS = {'#': SOLID, 'N': SOLID | NPC, 'D': DOOR, '~': SOLID}  # '~' is water
+
+
+def flag_table(flags=TILE_FLAGS):
+    """Build a 256-entry lookup from tile byte to flag bits."""
+    table = np.zeros(256, dtype=np.uint8)
+    for ch, bits in flags.items():
+        table[ord(ch)] = bits
+    return table
+
+
+def encode_rows(rows):
+    """Turn a list of row strings into a (height, width) uint8 array of tile bytes."""
+    return np.array([np.frombuffer(row.encode('ascii'), dtype=np.uint8) for row in rows])
+
+
+class TileCollider:
+    """Interface shared by every tile store that entities collide with.
+
+    Subclasses provide ``tile_size``, ``solid_at(tx, ty)`` and
+    ``region_solid(tx0, ty0, tx1, ty1)``; tiles outside the map are solid.
+    Movement itself is resolved by ``EntityStore.integrate``.
+    """
+
+
+class CollisionGrid(TileCollider):
+    """A room compiled into flag and solidity arrays for fast collision queries.
+
+    ``solid`` carries a one-tile ring of solid cells around the room so that
+    out-of-bounds lookups never need a branch; index it with ``ty + 1, tx + 1``.
+    """
+
+    def __init__(self, tiles, tile_size, flags=TILE_FLAGS):
+        self.tile_size = tile_size
+        self.table = flag_table(flags)
+        self.tiles = np.array(tiles, dtype=np.uint8)
+        self.height, self.width = self.tiles.shape
+        self.flags = self.table[self.tiles]
+        self.solid = np.ones((self.height + 2, self.width + 2), dtype=bool)
+        self.solid[1:-1, 1:-1] = self.flags & SOLID
+        self.version = 0  # bumped whenever a tile changes
+
+    @classmethod
+    def from_rows(cls, rows, tile_size, flags=TILE_FLAGS):
+        return cls(encode_rows(rows), tile_size, flags)
+
+    def set_tile(self, tx, ty, ch):
+        code = ord(ch)
+        if self.tiles[ty, tx] == code:
+            return
+        self.tiles[ty, tx] = code
+        self.flags[ty, tx] = self.table[code]
+        self.solid[ty + 1, tx + 1] = self.flags[ty, tx] & SOLID
+        self.version += 1
+
+    def flags_at(self, tx, ty):
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return int(self.flags[ty, tx])
+        return SOLID
+
+    def solid_at(self, tx, ty):
+        """Solidity of tile(s) ``tx, ty``; accepts scalars or integer arrays."""
+        tx = np.clip(tx, -1, self.width) + 1
+        ty = np.clip(ty, -1, self.height) + 1
+        return self.solid[ty, tx]
+
+    def region_solid(self, tx0, ty0, tx1, ty1):
+        """Solidity of the inclusive tile block ``tx0..tx1`` x ``ty0..ty1``."""
+        tx0, tx1 = (min(max(t, -1), self.width) + 1 for t in (tx0, tx1))
+        ty0, ty1 = (min(max(t, -1), self.height) + 1 for t in (ty0, ty1))
+        return self.solid[ty0:ty1 + 1, tx0:tx1 + 1]
@@ -0,0 +1,83 @@
+import pygame
+
+
+class DirtyRenderer:
+    """Redraws and presents only the parts of the screen that changed.
+
+    Each frame: call ``begin()`` to restore the background under whatever
+    was drawn last frame (plus any regions passed to ``mark()``), draw
+    through ``blit``/``fill``/``track``, then ``present()``.  With
+    ``enabled=False`` every frame is a full repaint and ``flip()``, so the
+    calling code is the same in both modes.
+
+    ``draw_background(screen, rect)`` must paint the static background
+    into ``rect`` of the screen.  ``display`` is what frames are presented
+    through: ``pygame.display`` by default, or anything else with
+    ``flip()`` and ``update(rects)`` (such as a LowResTarget).
+    """
+
+    def __init__(self, screen, draw_background, enabled=True, display=None):
+        self.screen = screen
+        self.display = display or pygame.display
+        self.draw_background = draw_background
+        self.enabled = enabled
+        self._drawn = []     # rects covered by sprites last frame
+        self._current = []   # rects covered by sprites this frame
+        self._marked = []    # background regions that changed (e.g. tiles)
+        self._full = True
+
+    def invalidate(self):
+        """Repaint and present the whole screen on the next frame."""
+        self._full = True
+
+    def mark(self, rect):
+        """Flag a background region (such as a changed tile) for repaint."""
+        self._marked.append(pygame.Rect(rect))
+
+    def begin(self):
+        if self._full or not self.enabled:
+            self.draw_background(self.screen, self.screen.get_rect())
+        else:
+            for rect in self._drawn + self._marked:
+                self.draw_background(self.screen, rect)
+        self._current = []
+
+    def track(self, rect):
+        """Record a region the caller drew into directly."""
+        rect = pygame.Rect(rect).clip(self.screen.get_rect())
+        if rect.width and rect.height:
+            self._current.append(rect)
+        return rect
+
+    def blit(self, surface, dest, area=None):
+        return self.track(self.screen.blit(surface, dest, area))
+
+    def blits(self, sequence):
+        """Blit ``(surface, dest[, area])`` items in one call, tracking each."""
+        for rect in self.screen.blits(sequence):
+            self.track(rect)
+
+    def fill(self, color, rect):
+        return self.track(self.screen.fill(color, rect))
+
+    def present(self):
+        if self._full or not self.enabled:
+            self.display.flip()
+        else:
+            self.display.update(_merge(self._drawn + self._marked + self._current))
+        self._drawn = self._current
+        self._marked = []
+        self._full = False
+
+
+def _merge(rects):
+    """Collapse overlapping rects so the display is updated once per area."""
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
@@ -0,0 +1,177 @@
+"""Structure-of-arrays store for overworld actors.
+
+Positions, velocities, sizes and flags live in contiguous NumPy arrays and
+are integrated and collided against the tile map in whole-array passes, so
+the per-frame cost is a fixed number of NumPy calls however many actors
+there are.
+"""
+import numpy as np
+import pygame
+
+# Entity flag bits
+ALIVE = 1
+COLLIDES = 2  # stopped by solid tiles
+
+# Bits of ``blocked`` after ``integrate``
+BLOCKED_X = 1
+BLOCKED_Y = 2
+
+_EDGE = 1e-6  # keeps a box touching a tile boundary out of the next tile
+
+
+class EntityStore:
+    """Actors as parallel arrays, indexed by a stable integer id.
+
+    ``pos`` is the top-left corner in pixels, ``vel`` is pixels per second,
+    ``size`` is (width, height).  ``prev`` holds each position before the
+    last ``integrate`` so drawing can interpolate between ticks.  Colliding
+    entities must be no larger than a tile.
+    """
+
+    def __init__(self, capacity=64):
+        self.pos = np.zeros((capacity, 2))
+        self.prev = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.size = np.zeros((capacity, 2))
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.tag = np.zeros(capacity, dtype=np.int16)  # free for game use
+        self.blocked = np.zeros(capacity, dtype=np.uint8)
+        self._free = list(range(capacity - 1, -1, -1))
+
+    @property
+    def capacity(self):
+        return len(self.flags)
+
+    @property
+    def alive(self):
+        return (self.flags & ALIVE).astype(bool)
+
+    def _grow(self, need):
+        old = self.capacity
+        new = max(need, old * 2, 16)
+        for name in ('pos', 'prev', 'vel', 'size', 'flags', 'tag', 'blocked'):
+            arr = getattr(self, name)
+            grown = np.zeros((new,) + arr.shape[1:], dtype=arr.dtype)
+            grown[:old] = arr
+            setattr(self, name, grown)
+        self._free = list(range(new - 1, old - 1, -1)) + self._free
+
+    def spawn_many(self, pos, size, flags=ALIVE | COLLIDES, tag=0):
+        """Add ``len(pos)`` entities at once; returns their ids."""
+        pos = np.asarray(pos, dtype=np.float64).reshape(-1, 2)
+        n = len(pos)
+        if n > len(self._free):
+            self._grow(self.capacity + n - len(self._free))
+        ids = np.array([self._free.pop() for _ in range(n)], dtype=np.intp)
+        self.pos[ids] = pos
+        self.prev[ids] = pos
+        self.vel[ids] = 0
+        self.size[ids] = size
+        self.flags[ids] = flags | ALIVE
+        self.tag[ids] = tag
+        self.blocked[ids] = 0
+        return ids
+
+    def spawn(self, x, y, w, h, flags=ALIVE | COLLIDES, tag=0):
+        return int(self.spawn_many([(x, y)], (w, h), flags, tag)[0])
+
+    def kill(self, ids):
+        ids = np.atleast_1d(ids)
+        self.flags[ids] = 0
+        self._free.extend(int(i) for i in ids)
+
+    def clear(self):
+        self.flags[:] = 0
+        self._free = list(range(self.capacity - 1, -1, -1))
+
+    def snapshot(self):
+        """Copies of every live entity's fields, keyed as in ``savestate.FIELDS``."""
+        ids = np.flatnonzero(self.alive)
+        return {
+            'ids': ids.astype(np.int32), 'pos': self.pos[ids], 'vel': self.vel[ids],
+            'size': self.size[ids], 'flags': self.flags[ids], 'tag': self.tag[ids],
+        }
+
+    def restore(self, entities):
+        """Replace the contents with a ``snapshot``; entities keep their ids."""
+        ids = np.asarray(entities['ids'], dtype=np.intp)
+        self.clear()
+        if len(ids) and ids.max() >= self.capacity:
+            self._grow(int(ids.max()) + 1)
+        self.pos[ids] = self.prev[ids] = entities['pos']
+        self.vel[ids] = entities['vel']
+        self.size[ids] = entities['size']
+        self.flags[ids] = entities['flags']
+        self.tag[ids] = entities['tag']
+        self.blocked[ids] = 0
+        free = np.ones(self.capacity, dtype=bool)
+        free[ids] = False
+        self._free = np.flatnonzero(free)[::-1].tolist()
+
+    def centers(self, ids):
+        return self.pos[ids] + self.size[ids] / 2
+
+    def rect(self, i):
+        x, y = self.pos[i]
+        w, h = self.size[i]
+        return pygame.Rect(int(x), int(y), int(w), int(h))
+
+    def lerp(self, ids, alpha):
+        """Positions ``alpha`` of the way from ``prev`` to ``pos``."""
+        prev = self.prev[ids]
+        return prev + (self.pos[ids] - prev) * alpha
+
+    def lerp_rect(self, i, alpha):
+        x, y = self.lerp(i, alpha)
+        w, h = self.size[i]
+        return pygame.Rect(int(x), int(y), int(w), int(h))
+
+    def integrate(self, dt, collider):
+        """Advance every live entity by ``vel * dt`` and resolve tile hits.
+
+        X and Y are resolved in separate passes.  Each pass tests the
+        leading edge's tile at the top/bottom (or left/right) corners and
+        snaps a blocked entity flush against the wall, zeroing that
+        velocity component.  Steps are clamped to just under a tile so
+        nothing can tunnel through a one-tile wall, which caps speed at
+        ``(tile_size - 1) / dt`` pixels per second (3720 px/s for 32 px
+        tiles at 120 Hz).  Only the corners are tested, so entities must be
+        no larger than a tile on each axis.
+        """
+        ts = collider.tile_size
+        live = self.alive
+        self.prev[:] = self.pos
+        self.blocked[:] = 0
+        limit = ts - 1
+        solid = (self.flags & COLLIDES).astype(bool) & live
+        ids = np.flatnonzero(solid)
+        free = np.flatnonzero(live & ~solid)
+        self.pos[free] += self.vel[free] * dt
+        if not len(ids):
+            return
+
+        pos, vel, size = self.pos[ids], self.vel[ids], self.size[ids]
+        for axis in (0, 1):
+            other = 1 - axis
+            step = np.clip(vel[:, axis] * dt, -limit, limit)
+            new = pos[:, axis] + step
+            fwd = step > 0
+            lead = np.where(fwd, new + size[:, axis] - _EDGE, new)
+            lead_tile = np.floor(lead / ts).astype(np.intp)
+            lo = np.floor(pos[:, other] / ts).astype(np.intp)
+            hi = np.floor((pos[:, other] + size[:, other] - _EDGE) / ts).astype(np.intp)
+            if axis == 0:
+                hit = collider.solid_at(lead_tile, lo) | collider.solid_at(lead_tile, hi)
+            else:
+                hit = collider.solid_at(lo, lead_tile) | collider.solid_at(hi, lead_tile)
+            hit &= step != 0
+            new = np.where(
+                hit,
+                np.where(fwd, lead_tile * ts - size[:, axis], (lead_tile + 1) * ts),
+                new,
+            )
+            pos[:, axis] = new
+            vel[hit, axis] = 0
+            self.blocked[ids[hit]] |= BLOCKED_X if axis == 0 else BLOCKED_Y
+        self.pos[ids] = pos
+        self.vel[ids] = vel
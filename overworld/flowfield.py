@@ -0,0 +1,141 @@
+"""Shared flow fields so any number of NPCs can chase or flee one target.
+
+A field holds the BFS distance from every tile of a room to the goal tile
+and, per tile, the step towards (and away from) it.  It is recomputed only
+when the goal changes tile, and steering a crowd is then a handful of
+array lookups no matter how many NPCs there are.
+"""
+import numpy as np
+
+CHASE = 1
+FLEE = -1
+
+UNREACHED = np.iinfo(np.int32).max
+
+# Neighbour order for the direction tables: right, left, down, up
+_STEPS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1)], dtype=np.int8)
+
+
+def _neighbour_dists(dist):
+    """(4, h, w) distances of each cell's right/left/down/up neighbours."""
+    out = np.full((4,) + dist.shape, UNREACHED, dtype=np.int32)
+    out[0, :, :-1] = dist[:, 1:]
+    out[1, :, 1:] = dist[:, :-1]
+    out[2, :-1, :] = dist[1:, :]
+    out[3, 1:, :] = dist[:-1, :]
+    return out
+
+
+class FlowField:
+    """BFS distance and step directions to a goal tile over a CollisionGrid."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.goal = None
+        self._version = None
+        shape = grid.solid.shape  # padded by one ring of walls
+        self.dist = np.full(shape, UNREACHED, dtype=np.int32)
+        self.toward = np.zeros(shape + (2,), dtype=np.int8)
+        self.away = np.zeros(shape + (2,), dtype=np.int8)
+
+    def update(self, goal):
+        """Recompute for goal tile ``goal`` if it (or the grid) changed.
+
+        Returns True if the field was rebuilt.
+        """
+        goal = tuple(goal)
+        if goal == self.goal and self.grid.version == self._version:
+            return False
+        self.goal = goal
+        self._version = self.grid.version
+        walk = ~self.grid.solid
+        dist = self.dist
+        dist.fill(UNREACHED)
+        gx, gy = goal[0] + 1, goal[1] + 1
+        if not (0 <= gy < walk.shape[0] and 0 <= gx < walk.shape[1]) or not walk[gy, gx]:
+            self.toward.fill(0)
+            self.away.fill(0)
+            return True
+
+        # Wavefront BFS: grow the frontier one tile per pass, whole-array at a time
+        frontier = np.zeros_like(walk)
+        frontier[gy, gx] = True
+        seen = frontier.copy()
+        dist[gy, gx] = 0
+        grow = np.empty_like(walk)
+        d = 0
+        while frontier.any():
+            d += 1
+            grow.fill(False)
+            grow[:, :-1] |= frontier[:, 1:]
+            grow[:, 1:] |= frontier[:, :-1]
+            grow[:-1, :] |= frontier[1:, :]
+            grow[1:, :] |= frontier[:-1, :]
+            np.logical_and(grow, walk, out=frontier)
+            frontier &= ~seen
+            seen |= frontier
+            dist[frontier] = d
+
+        near = _neighbour_dists(dist)
+        best = near.argmin(axis=0)
+        downhill = (near.min(axis=0) < dist) & walk
+        self.toward[...] = np.where(downhill[..., None], _STEPS[best], 0)
+        far = np.where(near == UNREACHED, -1, near)
+        worst = far.argmax(axis=0)
+        uphill = (far.max(axis=0) > dist) & walk & (dist != UNREACHED)
+        self.away[...] = np.where(uphill[..., None], _STEPS[worst], 0)
+        return True
+
+
+def steer(field, pos, modes, speed, target):
+    """Velocities for NPCs at ``pos`` ((n, 2) pixel centres).
+
+    ``modes`` holds CHASE or FLEE per NPC.  Each NPC heads for the centre
+    of the next tile along the field; chasers already on the goal tile head
+    straight for ``target`` (a pixel position), cornered fleers stop.
+    """
+    ts = field.grid.tile_size
+    tiles = (pos // ts).astype(np.intp)
+    tx = np.clip(tiles[:, 0], -1, field.grid.width) + 1
+    ty = np.clip(tiles[:, 1], -1, field.grid.height) + 1
+    step = np.where((modes == CHASE)[:, None], field.toward[ty, tx], field.away[ty, tx])
+    aim = (tiles + step) * ts + ts / 2
+    home = (modes == CHASE) & ~step.any(axis=1) & (field.dist[ty, tx] == 0)
+    aim[home] = target
+    vec = aim - pos
+    length = np.hypot(vec[:, 0], vec[:, 1])
+    moving = length > 0.5
+    vel = np.zeros_like(pos)
+    vel[moving] = vec[moving] * (speed / length[moving])[:, None]
+    return vel
+
+
+def walk(field, tiles, modes, steps):
+    """Move NPC ``tiles`` ((n, 2) ints) up to ``steps`` tiles along the field.
+
+    Used to catch up rooms that were not simulated: every NPC takes one
+    field step per pass, and passes stop early once nobody can move.
+    """
+    tiles = np.array(tiles, dtype=np.intp).reshape(-1, 2)
+    chase = (modes == CHASE)[:, None]
+    for _ in range(int(steps)):
+        tx = np.clip(tiles[:, 0], -1, field.grid.width) + 1
+        ty = np.clip(tiles[:, 1], -1, field.grid.height) + 1
+        step = np.where(chase, field.toward[ty, tx], field.away[ty, tx])
+        if not step.any():
+            break
+        tiles += step
+    return tiles
+
+
+def parse_crowd(data):
+    """Read ``crowd: X Y chase|flee`` map entries into start tiles and modes."""
+    tiles, modes = [], []
+    for value in data.get_all('crowd'):
+        try:
+            x, y, mode = value.split()
+            modes.append({'chase': CHASE, 'flee': FLEE}[mode])
+            tiles.append((int(x), int(y)))
+        except (KeyError, ValueError):
+            raise ValueError(f"{data.path}: bad crowd entry {value!r}") from None
+    return np.array(tiles, dtype=np.float64).reshape(-1, 2), np.array(modes, dtype=np.int8)
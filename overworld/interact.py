@@ -0,0 +1,104 @@
+class Interactable:
+    """Something the player can walk onto or talk to, anchored to a tile.
+
+    ``kind`` is ``'door'`` (``data`` = ``(room, (spawn_x, spawn_y))``),
+    ``'npc'`` (``data`` = dialogue id) or ``'trigger'`` (``data`` = event id).
+    """
+
+    __slots__ = ('kind', 'x', 'y', 'data')
+
+    def __init__(self, kind, x, y, data):
+        self.kind = kind
+        self.x = x
+        self.y = y
+        self.data = data
+
+    def __repr__(self):
+        return f"Interactable({self.kind!r}, {self.x}, {self.y}, {self.data!r})"
+
+
+def _parse(data, key, fields, path):
+    for value in data.get_all(key):
+        parts = value.split()
+        if len(parts) != fields:
+            raise ValueError(f"{path}: bad {key} entry {value!r}")
+        yield parts
+
+
+class InteractIndex:
+    """Per-room spatial index of interactables, keyed by tile."""
+
+    def __init__(self, items=()):
+        self._by_tile = {}
+        for item in items:
+            self.add(item)
+
+    @classmethod
+    def from_map(cls, data):
+        """Build the index from a map's header entries::
+
+            door: X Y ROOM SPAWN_X SPAWN_Y
+            npc: X Y DIALOGUE_ID
+            trigger: X Y EVENT_ID
+        """
+        index = cls()
+        for x, y, room, sx, sy in _parse(data, 'door', 5, data.path):
+            index.add(Interactable('door', int(x), int(y), (room, (int(sx), int(sy)))))
+        for x, y, dialogue in _parse(data, 'npc', 3, data.path):
+            index.add(Interactable('npc', int(x), int(y), dialogue))
+        for x, y, event in _parse(data, 'trigger', 3, data.path):
+            index.add(Interactable('trigger', int(x), int(y), event))
+        return index
+
+    def add(self, item):
+        self._by_tile.setdefault((item.x, item.y), []).append(item)
+
+    def remove(self, item):
+        items = self._by_tile.get((item.x, item.y), [])
+        if item in items:
+            items.remove(item)
+            if not items:
+                del self._by_tile[item.x, item.y]
+
+    def at(self, x, y):
+        return self._by_tile.get((x, y), ())
+
+    def near(self, x, y, radius=1):
+        """Interactables within ``radius`` tiles (a square) of ``x, y``."""
+        found = []
+        for ty in range(y - radius, y + radius + 1):
+            for tx in range(x - radius, x + radius + 1):
+                found.extend(self._by_tile.get((tx, ty), ()))
+        return found
+
+    def __iter__(self):
+        for items in self._by_tile.values():
+            yield from items
+
+
+class TileTracker:
+    """Turns a moving tile position into enter/exit events.
+
+    ``update(tile)`` does nothing unless the tile changed, so the per-frame
+    cost is one comparison however many interactables the room has.
+    """
+
+    def __init__(self, index, tile=None):
+        self.index = index
+        self.tile = tile
+
+    def reset(self, index, tile=None):
+        """Switch rooms without firing events for the spawn tile."""
+        self.index = index
+        self.tile = tile
+
+    def update(self, tile):
+        """Return ``[(event, item), ...]`` with ``event`` ``'exit'`` or ``'enter'``."""
+        if tile == self.tile:
+            return []
+        events = []
+        if self.tile is not None:
+            events.extend(('exit', item) for item in self.index.at(*self.tile))
+        events.extend(('enter', item) for item in self.index.at(*tile))
+        self.tile = tile
+        return events
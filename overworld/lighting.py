@@ -0,0 +1,168 @@
+"""Lighting for dark rooms: cached light masks composited in one multiply.
+
+A light is a radial falloff mask cut by what the light can see.  Its
+field of view comes from shadowcasting over the room's collision grid,
+and the resulting surface is cached per (tile, radius, colour), so each
+light position costs one shadowcast the first time and a lookup after.
+Each frame the lights are added into a darkness layer filled with the
+room's ambient colour, and the layer is multiplied onto the screen in a
+single ``BLEND_MULT`` blit.
+
+Map entries (tile coordinates, RGB 0-255)::
+
+    ambient: R G B              ; makes the room dark at this base light
+    light: X Y RADIUS [R G B]   ; a fixed light, RADIUS in tiles
+"""
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+# Octant transforms for shadowcasting: (xx, xy, yx, yy)
+_OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+
+@lru_cache(maxsize=32)
+def radial_mask(radius, color=(255, 255, 255)):
+    """Square surface with light fading from ``color`` at the centre to black at ``radius`` px."""
+    size = 2 * radius
+    y, x = np.mgrid[0:size, 0:size] + 0.5 - radius
+    falloff = np.clip(1.0 - np.hypot(x, y) / radius, 0.0, 1.0) ** 1.5
+    rgb = (falloff.T[..., None] * np.array(color, dtype=np.float64)).astype(np.uint8)
+    return pygame.surfarray.make_surface(rgb)
+
+
+def field_of_view(solid, origin, radius):
+    """Tiles visible from ``origin`` within ``radius``, by recursive shadowcasting.
+
+    ``solid`` is a (height, width) bool array; tiles outside it are solid.
+    Returns a (2r+1, 2r+1) bool array centred on ``origin``.  Walls that are
+    seen are included, so lights illuminate the faces of the walls around them.
+    """
+    h, w = solid.shape
+    ox, oy = origin
+    seen = np.zeros((2 * radius + 1, 2 * radius + 1), dtype=bool)
+    seen[radius, radius] = True
+
+    def blocked(x, y):
+        return not (0 <= x < w and 0 <= y < h) or solid[y, x]
+
+    def cast(row, start, end, xx, xy, yx, yy):
+        if start < end:
+            return
+        for j in range(row, radius + 1):
+            dx, dy = -j - 1, -j
+            was_blocked = False
+            new_start = start
+            while dx <= 0:
+                dx += 1
+                left, right = (dx - 0.5) / (dy + 0.5), (dx + 0.5) / (dy - 0.5)
+                if start < right:
+                    continue
+                if end > left:
+                    break
+                mx, my = ox + dx * xx + dy * xy, oy + dx * yx + dy * yy
+                if dx * dx + dy * dy <= radius * radius:
+                    seen[my - oy + radius, mx - ox + radius] = True
+                wall = blocked(mx, my)
+                if was_blocked:
+                    if wall:
+                        new_start = right
+                        continue
+                    was_blocked = False
+                    start = new_start
+                elif wall and j < radius:
+                    was_blocked = True
+                    cast(j + 1, start, left, xx, xy, yx, yy)
+                    new_start = right
+            if was_blocked:
+                break
+
+    for octant in _OCTANTS:
+        cast(1, 1.0, 0.0, *octant)
+    return seen
+
+
+def parse_lights(data):
+    """Read ``ambient`` and ``light`` entries: ``(ambient or None, [(x, y, radius, color)])``."""
+    ambient = data.get('ambient')
+    try:
+        if ambient is not None:
+            ambient = tuple(int(v) for v in ambient.split())
+            if len(ambient) != 3:
+                raise ValueError
+    except ValueError:
+        raise ValueError(f"{data.path}: bad ambient entry {data.get('ambient')!r}") from None
+    lights = []
+    for value in data.get_all('light'):
+        try:
+            x, y, radius, *color = (int(v) for v in value.split())
+            if len(color) not in (0, 3):
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"{data.path}: bad light entry {value!r}") from None
+        lights.append((x, y, radius, tuple(color) or (255, 255, 255)))
+    return ambient, lights
+
+
+class LightMap:
+    """Light surfaces for one room's collision grid, cached per light position.
+
+    The cache is dropped when the grid's ``version`` changes, since walls
+    moving changes every shadow.
+    """
+
+    def __init__(self, grid, cache_size=256):
+        self.grid = grid
+        self.cache_size = cache_size
+        self._lights = OrderedDict()
+        self._version = grid.version
+        self._layer = None
+
+    def light(self, tile, radius, color=(255, 255, 255)):
+        """Surface for a light on ``tile``; its top-left sits ``radius`` tiles up-left of the tile."""
+        if self.grid.version != self._version:
+            self._version = self.grid.version
+            self._lights.clear()
+        key = (tuple(tile), radius, tuple(color))
+        surf = self._lights.get(key)
+        if surf is not None:
+            self._lights.move_to_end(key)
+            return surf
+        ts = self.grid.tile_size
+        seen = field_of_view(self.grid.solid[1:-1, 1:-1], tile, radius)
+        # One pixel per tile, smoothed up to full size for soft shadow edges
+        vis = pygame.surfarray.make_surface(np.repeat(seen.T[..., None] * 255, 3, axis=2).astype(np.uint8))
+        size = (2 * radius + 1) * ts
+        surf = radial_mask(size // 2, tuple(color)).copy()
+        surf.blit(pygame.transform.smoothscale(vis, surf.get_size()), (0, 0),
+                  special_flags=pygame.BLEND_MULT)
+        self._lights[key] = surf
+        if len(self._lights) > self.cache_size:
+            self._lights.popitem(last=False)
+        return surf
+
+    def apply(self, screen, camera, ambient, lights):
+        """Darken ``screen`` to ``ambient`` except where ``lights`` reach.
+
+        ``lights`` are ``(x, y, radius, color)`` in tiles.
+        """
+        if self._layer is None or self._layer.get_size() != screen.get_size():
+            self._layer = pygame.Surface(screen.get_size()).convert()
+        layer = self._layer
+        layer.fill(ambient)
+        ts = self.grid.tile_size
+        view = camera.rect
+        batch = []
+        for x, y, radius, color in lights:
+            dest = pygame.Rect((x - radius) * ts, (y - radius) * ts,
+                               (2 * radius + 1) * ts, (2 * radius + 1) * ts)
+            if dest.colliderect(view):
+                batch.append((self.light((x, y), radius, color), camera.to_screen(dest), None,
+                              pygame.BLEND_ADD))
+        layer.blits(batch, doreturn=False)
+        screen.blit(layer, (0, 0), special_flags=pygame.BLEND_MULT)
@@ -0,0 +1,33 @@
+"""Fixed-timestep simulation with interpolated rendering.
+
+Gameplay advances in constant ``dt`` ticks however fast frames are drawn:
+each frame's real duration is added to an accumulator and whole ticks are
+run out of it.  The leftover fraction of a tick, ``alpha``, is used to draw
+actors between their previous and current positions so motion stays
+smooth when the render and tick rates differ.
+"""
+
+
+class FixedStepLoop:
+    """Accumulator that turns variable frame times into fixed ticks.
+
+    ``rate`` is ticks per second.  A frame longer than ``max_frame`` seconds
+    (a stall, a dragged window) is cut short so the simulation drops time
+    instead of running a burst of catch-up ticks.
+    """
+
+    def __init__(self, rate=120, max_frame=0.25):
+        self.dt = 1.0 / rate
+        self.max_frame = max_frame
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.ticks = 0  # total ticks run
+
+    def advance(self, frame_time):
+        """Add ``frame_time`` seconds; return how many ticks to run now."""
+        self.accumulator += min(frame_time, self.max_frame)
+        steps = int(self.accumulator / self.dt)
+        self.accumulator -= steps * self.dt
+        self.alpha = self.accumulator / self.dt
+        self.ticks += steps
+        return steps
@@ -0,0 +1,62 @@
+"""Draw at a small native resolution and scale up to the window.
+
+The game renders into ``LowResTarget.surface`` (say 320x240 with 16-pixel
+tiles) and each frame is blown up by a whole-number factor with
+nearest-neighbour scaling, letterboxed in the window.  Drawing touches
+``scale ** 2`` times fewer pixels than drawing at window size.
+
+The target can stand in for ``pygame.display`` in a DirtyRenderer: with
+dirty rects on, only the changed regions are scaled and pushed.
+"""
+import pygame
+
+
+class LowResTarget:
+    """Native-resolution surface presented through an integer upscale.
+
+    ``window_size`` defaults to ``native_size * scale``; a larger window
+    (or fullscreen) gets the largest whole scale that fits, centred with
+    black bars.
+    """
+
+    def __init__(self, native_size, scale=2, window_size=None, flags=0):
+        native_size = tuple(native_size)
+        if window_size is None:
+            window_size = (native_size[0] * scale, native_size[1] * scale)
+        self.window = pygame.display.set_mode(window_size, flags)
+        ww, wh = self.window.get_size()
+        self.scale = max(1, min(ww // native_size[0], wh // native_size[1]))
+        self.surface = pygame.Surface(native_size).convert()
+        size = (native_size[0] * self.scale, native_size[1] * self.scale)
+        self.viewport = pygame.Rect(((ww - size[0]) // 2, (wh - size[1]) // 2), size)
+        self._scaled = self.window.subsurface(self.viewport)
+        self.window.fill((0, 0, 0))
+
+    def to_native(self, pos):
+        """Window pixel position (such as a mouse click) in native pixels."""
+        return ((pos[0] - self.viewport.x) // self.scale,
+                (pos[1] - self.viewport.y) // self.scale)
+
+    def _window_rect(self, rect):
+        s = self.scale
+        return pygame.Rect(rect.x * s + self.viewport.x, rect.y * s + self.viewport.y,
+                           rect.width * s, rect.height * s)
+
+    def flip(self):
+        """Scale the whole native surface into the window and show it."""
+        pygame.transform.scale(self.surface, self.viewport.size, self._scaled)
+        pygame.display.flip()
+
+    def update(self, rects):
+        """Scale and show only ``rects`` (native coordinates)."""
+        shown = []
+        bounds = self.surface.get_rect()
+        s = self.scale
+        for rect in rects:
+            rect = pygame.Rect(rect).clip(bounds)
+            if not rect.width or not rect.height:
+                continue
+            dest = self._scaled.subsurface((rect.x * s, rect.y * s, rect.width * s, rect.height * s))
+            pygame.transform.scale(self.surface.subsurface(rect), dest.get_size(), dest)
+            shown.append(self._window_rect(rect))
+        pygame.display.update(shown)
@@ -0,0 +1,203 @@
+"""Text map files and their compiled binary cache.
+
+A map file is a header of ``key: value`` lines (keys may repeat, lines
+starting with ``;`` are comments), a ``---`` separator, then one line per
+tile row::
+
+    name: classroom
+    ---
+    #####
+    #.D.#
+    #####
+
+The first load compiles the file into ``.cache/<file>.tiles`` next to it:
+a fixed header (size, source mtime/size and SHA-1), the header entries as
+JSON, then the raw tile bytes.  Later loads memory-map the tiles straight
+from the cache without parsing the text.
+"""
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'OWMP'
+VERSION = 1
+# magic, version, width, height, source mtime_ns, source size, sha1, meta length
+HEADER = struct.Struct('<4sHxxIIqQ20sI')
+ALIGN = 16
+
+
+class MapData:
+    """A loaded map: ``tiles`` is a (height, width) uint8 array of tile bytes."""
+
+    def __init__(self, path, tiles, entries):
+        self.path = path
+        self.tiles = tiles
+        self.entries = entries  # [(key, value), ...] in file order
+
+    @property
+    def name(self):
+        return self.get('name', os.path.splitext(os.path.basename(self.path))[0])
+
+    @property
+    def width(self):
+        return self.tiles.shape[1]
+
+    @property
+    def height(self):
+        return self.tiles.shape[0]
+
+    @property
+    def rows(self):
+        return [bytes(row).decode('ascii') for row in self.tiles]
+
+    def get(self, key, default=None):
+        """Value of the last ``key`` entry, or ``default``."""
+        for k, v in reversed(self.entries):
+            if k == key:
+                return v
+        return default
+
+    def get_all(self, key):
+        """Values of every ``key`` entry, in file order."""
+        return [v for k, v in self.entries if k == key]
+
+
+def parse_map(text, path='<string>'):
+    """Parse map text into ``(entries, tiles)``."""
+    lines = text.splitlines()
+    try:
+        split = lines.index('---')
+    except ValueError:
+        raise ValueError(f"{path}: missing '---' between header and tiles") from None
+    entries = []
+    for n, line in enumerate(lines[:split], 1):
+        line = line.strip()
+        if not line or line.startswith(';'):
+            continue
+        key, sep, value = line.partition(':')
+        if not sep:
+            raise ValueError(f"{path}:{n}: expected 'key: value', got {line!r}")
+        entries.append((key.strip(), value.strip()))
+    rows = [row.rstrip('\r\n') for row in lines[split + 1:] if row.strip()]
+    if not rows:
+        raise ValueError(f"{path}: map has no tile rows")
+    width = len(rows[0])
+    for n, row in enumerate(rows, split + 2):
+        if len(row) != width:
+            raise ValueError(f"{path}:{n}: row is {len(row)} tiles wide, expected {width}")
+    tiles = np.frombuffer(''.join(rows).encode('ascii'), dtype=np.uint8).reshape(len(rows), width)
+    return entries, tiles
+
+
+def cache_path(path):
+    head, tail = os.path.split(os.path.abspath(path))
+    return os.path.join(head, '.cache', tail + '.tiles')
+
+
+def _read_header(cache):
+    try:
+        with open(cache, 'rb') as f:
+            raw = f.read(HEADER.size)
+            header = HEADER.unpack(raw)
+            if header[0] != MAGIC or header[1] != VERSION:
+                return None, None
+            meta = f.read(header[7])
+        return header, meta
+    except (OSError, struct.error):
+        return None, None
+
+
+def _tiles_offset(meta_len):
+    return -(-(HEADER.size + meta_len) // ALIGN) * ALIGN
+
+
+def compile_map(path):
+    """Parse ``path`` and (re)write its binary cache."""
+    with open(path, 'rb') as f:
+        source = f.read()
+    st = os.stat(path)
+    entries, tiles = parse_map(source.decode('ascii'), path)
+    meta = json.dumps(entries).encode('utf-8')
+    header = HEADER.pack(
+        MAGIC, VERSION, tiles.shape[1], tiles.shape[0],
+        st.st_mtime_ns, st.st_size, hashlib.sha1(source).digest(), len(meta),
+    )
+    cache = cache_path(path)
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    tmp = cache + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(meta)
+        f.write(b'\0' * (_tiles_offset(len(meta)) - HEADER.size - len(meta)))
+        f.write(tiles.tobytes())
+    os.replace(tmp, cache)
+    return cache
+
+
+def load_map(path):
+    """Load a map, using (and refreshing) its binary cache.
+
+    The cache is trusted when the source's mtime and size match; otherwise
+    the source is hashed and only re-parsed if its contents changed.
+    """
+    cache = cache_path(path)
+    header, meta = _read_header(cache)
+    st = os.stat(path)
+    if header is not None and (header[4], header[5]) != (st.st_mtime_ns, st.st_size):
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).digest()
+        if digest == header[6]:
+            # Same contents (e.g. touched or checked out again): restamp only
+            header = header[:4] + (st.st_mtime_ns, st.st_size) + header[6:]
+            with open(cache, 'r+b') as f:
+                f.write(HEADER.pack(*header))
+        else:
+            header = None
+    if header is None:
+        compile_map(path)
+        header, meta = _read_header(cache)
+    width, height = header[2], header[3]
+    tiles = np.memmap(cache, dtype=np.uint8, mode='r', offset=_tiles_offset(len(meta)),
+                      shape=(height, width))
+    entries = [tuple(e) for e in json.loads(meta)]
+    return MapData(path, tiles, entries)
+
+
+class MapWatcher:
+    """Polls map files for changes so rooms can be hot-reloaded.
+
+    ``poll(now)`` stats the files at most once per ``interval`` seconds and
+    returns the paths whose mtime or size changed since the last poll.
+    """
+
+    def __init__(self, paths=(), interval=0.5):
+        self.interval = interval
+        self._stamps = {}
+        self._next = 0.0
+        for path in paths:
+            self.watch(path)
+
+    def _stamp(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def watch(self, path):
+        self._stamps[path] = self._stamp(path)
+
+    def poll(self, now):
+        if now < self._next:
+            return []
+        self._next = now + self.interval
+        changed = []
+        for path, old in self._stamps.items():
+            stamp = self._stamp(path)
+            if stamp != old and stamp is not None:
+                self._stamps[path] = stamp
+                changed.append(path)
+        return changed
@@ -0,0 +1,278 @@
+"""Grid pathfinding: A* with jump-point search over a tile collider.
+
+Moves are 8-directional and never cut a wall corner.  The jump tables
+for straight moves are computed once per grid with NumPy, so a straight
+jump is a single array lookup and a search only touches jump points.
+"""
+import heapq
+from collections import OrderedDict
+
+import numpy as np
+
+SQRT2 = 2 ** 0.5
+
+
+def _next_stop(stop, axis, reverse):
+    """Index of the nearest True cell at or after (or before) each cell along ``axis``."""
+    idx = np.arange(stop.shape[axis], dtype=np.int32)
+    idx = idx[None, :] if axis == 1 else idx[:, None]
+    if reverse:
+        return np.maximum.accumulate(np.where(stop, idx, -1), axis=axis)
+    flipped = np.flip(np.where(stop, idx, stop.shape[axis]), axis=axis)
+    return np.flip(np.minimum.accumulate(flipped, axis=axis), axis=axis)
+
+
+def _contains(outer, inner):
+    """Whether tile window ``outer`` (x0, y0, x1, y1, inclusive) covers ``inner``."""
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and outer[2] >= inner[2] and outer[3] >= inner[3])
+
+
+class JumpGrid:
+    """Walkability with precomputed straight-jump tables.
+
+    ``walkable`` is a (height, width) bool array.  Internally everything is
+    padded with a one-cell ring of walls so no lookup needs a bounds check,
+    and cells are addressed by flat index ``y * stride + x`` into bytes and
+    memoryviews, which index much faster than NumPy scalars.
+    """
+
+    def __init__(self, walkable):
+        h, w = walkable.shape
+        walk = np.zeros((h + 2, w + 2), dtype=bool)
+        walk[1:-1, 1:-1] = walkable
+        self.width, self.height = w, h
+        self.stride = stride = w + 2
+
+        # A cell is a jump point for a straight move if a wall beside the
+        # previous cell opens up beside this one (a forced neighbour).
+        inner = (slice(1, -1), slice(1, -1))
+        stop = {}
+        for name, side, back in (
+            ('e', ((-1, 0), (1, 0)), (0, -1)),
+            ('w', ((-1, 0), (1, 0)), (0, 1)),
+            ('s', ((0, -1), (0, 1)), (-1, 0)),
+            ('n', ((0, -1), (0, 1)), (1, 0)),
+        ):
+            # ``side`` and ``back`` are (dy, dx) offsets from the cell
+            forced = np.zeros_like(walk)
+            for oy, ox in side:
+                beside = self._shift(walk, oy, ox)
+                beside_prev = self._shift(walk, oy + back[0], ox + back[1])
+                forced[inner] |= (beside & ~beside_prev)[inner]
+            stop[name] = ~walk | forced
+        rows = np.arange(h + 2, dtype=np.int32)[:, None] * stride
+        cols = np.arange(w + 2, dtype=np.int32)[None, :]
+        # Flat index of the first stop cell in each direction
+        self._tables = {
+            1: memoryview(rows + _next_stop(stop['e'], 1, False)).cast('B').cast('i'),
+            -1: memoryview(rows + _next_stop(stop['w'], 1, True)).cast('B').cast('i'),
+            stride: memoryview(_next_stop(stop['s'], 0, False) * stride + cols).cast('B').cast('i'),
+            -stride: memoryview(_next_stop(stop['n'], 0, True) * stride + cols).cast('B').cast('i'),
+        }
+        self.walk = walk.tobytes()
+
+    @staticmethod
+    def _shift(a, dy, dx):
+        """``out[y, x] = a[y + dy, x + dx]`` with out-of-range cells False."""
+        out = np.zeros_like(a)
+        h, w = a.shape
+        out[max(0, -dy):h - max(0, dy), max(0, -dx):w - max(0, dx)] = \
+            a[max(0, dy):h - max(0, -dy), max(0, dx):w - max(0, -dx)]
+        return out
+
+    def _straight(self, i, d, goal):
+        if not self.walk[i]:
+            return None
+        s = self._tables[d][i]
+        if d > 0:
+            if i <= goal <= s and (d == 1 or (goal - i) % d == 0):
+                return goal
+        elif s <= goal <= i and (d == -1 or (i - goal) % d == 0):
+            return goal
+        return s if self.walk[s] else None
+
+    def _jump(self, i, dx, dy, goal):
+        if not dx or not dy:
+            return self._straight(i, dx or dy, goal)
+        walk = self.walk
+        step = dx + dy
+        while walk[i]:
+            if i == goal:
+                return goal
+            if self._straight(i + dx, dx, goal) is not None or self._straight(i + dy, dy, goal) is not None:
+                return i
+            if not (walk[i + dx] and walk[i + dy]):
+                return None
+            i += step
+        return None
+
+    def _neighbours(self, i, parent):
+        """Pruned move directions from ``i`` as ``(dx, dy)`` flat offsets."""
+        walk, w = self.walk, self.stride
+        if parent is None:
+            dirs = [(d, 0) for d in (1, -1) if walk[i + d]]
+            dirs += [(0, d) for d in (w, -w) if walk[i + d]]
+            dirs += [(dx, dy) for dx in (1, -1) for dy in (w, -w) if walk[i + dx] and walk[i + dy]]
+            return dirs
+        px, py = parent % w, parent // w
+        x, y = i % w, i // w
+        dx = (x > px) - (x < px)
+        dy = ((y > py) - (y < py)) * w
+        dirs = []
+        if dx and dy:
+            a, b = walk[i + dy], walk[i + dx]
+            if a:
+                dirs.append((0, dy))
+            if b:
+                dirs.append((dx, 0))
+            if a and b:
+                dirs.append((dx, dy))
+        elif dx:
+            ahead, up, down = walk[i + dx], walk[i + w], walk[i - w]
+            if ahead:
+                dirs.append((dx, 0))
+                if up:
+                    dirs.append((dx, w))
+                if down:
+                    dirs.append((dx, -w))
+            if up:
+                dirs.append((0, w))
+            if down:
+                dirs.append((0, -w))
+        else:
+            ahead, right, left = walk[i + dy], walk[i + 1], walk[i - 1]
+            if ahead:
+                dirs.append((0, dy))
+                if right:
+                    dirs.append((1, dy))
+                if left:
+                    dirs.append((-1, dy))
+            if right:
+                dirs.append((1, 0))
+            if left:
+                dirs.append((-1, 0))
+        return dirs
+
+    def find(self, start, goal):
+        """Return the jump points from ``start`` to ``goal`` (tile coords) or None.
+
+        Consecutive points are joined by straight or 45-degree lines.
+        """
+        w = self.stride
+        start = (start[1] + 1) * w + start[0] + 1
+        goal = (goal[1] + 1) * w + goal[0] + 1
+        if not (self.walk[start] and self.walk[goal]):
+            return None
+        gx, gy = goal % w, goal // w
+
+        def octile(a, bx, by):
+            ddx, ddy = abs(a % w - bx), abs(a // w - by)
+            return (SQRT2 - 1) * min(ddx, ddy) + max(ddx, ddy)
+
+        g = {start: 0.0}
+        parent = {start: None}
+        heap = [(octile(start, gx, gy), start)]
+        closed = set()
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node == goal:
+                path = []
+                while node is not None:
+                    path.append((node % w - 1, node // w - 1))
+                    node = parent[node]
+                return path[::-1]
+            if node in closed:
+                continue
+            closed.add(node)
+            nx, ny = node % w, node // w
+            for dx, dy in self._neighbours(node, parent[node]):
+                point = self._jump(node + dx + dy, dx, dy, goal)
+                if point is None or point in closed:
+                    continue
+                cost = g[node] + octile(point, nx, ny)
+                if cost < g.get(point, float('inf')):
+                    g[point] = cost
+                    parent[point] = node
+                    heapq.heappush(heap, (cost + octile(point, gx, gy), point))
+        return None
+
+
+class Pathfinder:
+    """Path queries over a room's collider with per-room caching.
+
+    Searches run on a window around start and goal (``margin`` tiles of
+    slack, or the whole map if it is smaller), so streamed worlds never
+    build tables for the entire map.  If the goal cannot be reached inside
+    the window, the margin doubles until a path is found, the window covers
+    the whole map or it would grow past ``max_area`` tiles; only that last
+    miss is cached as None.  A solid start or goal fails straight away.
+    Jump tables and finished paths are cached and thrown away when the
+    collider's ``version`` changes.
+    """
+
+    def __init__(self, collider, margin=32, cache_size=256, max_area=256 * 256):
+        self.collider = collider
+        self.margin = margin
+        self.max_area = max_area
+        self.cache_size = cache_size
+        self._version = None
+        self._paths = OrderedDict()
+        self._grid = None
+        self._window = None
+
+    def _jump_grid(self, window):
+        if self._grid is None or self._window != window:
+            x0, y0, x1, y1 = window
+            self._grid = JumpGrid(~self.collider.region_solid(x0, y0, x1, y1))
+            self._window = window
+        return self._grid
+
+    def _window_around(self, start, goal, m):
+        c = self.collider
+        return (
+            max(0, min(start[0], goal[0]) - m), max(0, min(start[1], goal[1]) - m),
+            min(c.width - 1, max(start[0], goal[0]) + m), min(c.height - 1, max(start[1], goal[1]) + m),
+        )
+
+    def find(self, start, goal):
+        """Tile path (jump points, start and goal included) or None if unreachable."""
+        if self.collider.version != self._version:
+            self._version = self.collider.version
+            self._paths.clear()
+            self._grid = None
+        key = (tuple(start), tuple(goal))
+        if key in self._paths:
+            self._paths.move_to_end(key)
+            return self._paths[key]
+        c = self.collider
+        m = self.margin
+        path = None
+        # Tiles outside the map are solid, so this also rejects them
+        if not (c.solid_at(*start) or c.solid_at(*goal)):
+            window = self._window_around(start, goal, m)
+            if self._window is not None and _contains(self._window, window):
+                window = self._window  # reuse the tables we already have
+            while True:
+                x0, y0 = window[0], window[1]
+                grid = self._jump_grid(window)
+                path = grid.find((start[0] - x0, start[1] - y0), (goal[0] - x0, goal[1] - y0))
+                if path is not None:
+                    path = [(x + x0, y + y0) for x, y in path]
+                    break
+                if window == (0, 0, c.width - 1, c.height - 1):
+                    break  # searched the whole map: really unreachable
+                # The way round may leave the window; widen it past what was searched
+                searched = window
+                while _contains(searched, window):
+                    m *= 2
+                    window = self._window_around(start, goal, m)
+                if (window[2] - window[0] + 1) * (window[3] - window[1] + 1) > self.max_area:
+                    break  # give up rather than search a huge region
+        self._paths[key] = path
+        if len(self._paths) > self.cache_size:
+            self._paths.popitem(last=False)
+        return path
+
+    def invalidate(self):
+        self._version = None
@@ -0,0 +1,71 @@
+"""Per-phase frame timings for the overworld main loops.
+
+The demos mark the end of each phase of a frame (``PHASES.mark('collision')``)
+and the timer adds up the wall time spent in each phase per frame.  It is
+off unless something (such as ``python -m overworld.bench``) enables it, in
+which case ``mark`` is a single attribute check.
+"""
+import time
+from collections import defaultdict
+
+import numpy as np
+
+
+class PhaseTimer:
+    """Sums time per named phase for each frame between ``begin`` calls.
+
+    Phases may be marked several times per frame (once per simulation
+    tick, say); their times are added together.  ``samples[phase]`` holds
+    one total per frame, in seconds, with 0 for frames where a known phase
+    did not run.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.samples = defaultdict(list)
+        self.frames = 0
+        self._frame = {}
+        self._last = 0.0
+
+    def reset(self):
+        self.samples.clear()
+        self.frames = 0
+        self._frame = {}
+
+    def begin(self):
+        """Start a new frame, closing the previous one."""
+        if not self.enabled:
+            return
+        if self._frame:
+            for phase in [*self.samples, *(p for p in self._frame if p not in self.samples)]:
+                self.samples[phase].extend([0.0] * (self.frames - len(self.samples[phase])))
+                self.samples[phase].append(self._frame.get(phase, 0.0))
+            self.frames += 1
+        self._frame = {}
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to ``phase``."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._frame[phase] = self._frame.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """``{phase: [ms at each percentile]}`` plus a ``'frame'`` total."""
+        if not self.frames:
+            return {}
+        table = {
+            phase: np.array(times[:self.frames] + [0.0] * (self.frames - len(times)))
+            for phase, times in self.samples.items()
+        }
+        table['frame'] = sum(table.values())
+        return {
+            phase: [float(v) * 1000 for v in np.percentile(times, percentiles)]
+            for phase, times in table.items()
+        }
+
+
+# Shared by the demo scripts and the benchmark runner
+PHASES = PhaseTimer()
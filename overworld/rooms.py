@@ -0,0 +1,125 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from overworld.background import RoomBackground
+from overworld.collision import CollisionGrid
+from overworld.flowfield import FlowField, parse_crowd
+from overworld.interact import InteractIndex
+from overworld.lighting import LightMap, parse_lights
+from overworld.mapfile import load_map
+from overworld.scheduler import parse_timers
+
+
+class Room:
+    """Everything needed to play a room, built once and reused while cached.
+
+    Collision, the static background, the interactable index, the crowd
+    spawns, the lights and the timers all come from the map file (see
+    ``InteractIndex.from_map``, ``parse_crowd``, ``parse_lights`` and
+    ``parse_timers`` for the entries).  Rooms without an ``ambient`` entry
+    are fully lit and have no ``lighting``.
+    """
+
+    def __init__(self, name, data, tile_size, tiles, default=None, fill=(0, 0, 0)):
+        self.name = name
+        self.data = data
+        self.grid = CollisionGrid(data.tiles, tile_size)
+        self.background = RoomBackground(data.rows, tile_size, tiles, default, fill)
+        self.interactables = InteractIndex.from_map(data)
+        self.field = FlowField(self.grid)
+        self.crowd = parse_crowd(data)  # (start tiles, modes) of moving NPCs
+        self.ambient, self.lights = parse_lights(data)
+        self.timers = parse_timers(data)  # templates; each RoomSim runs its own copies
+        self.lighting = LightMap(self.grid) if self.ambient is not None else None
+
+    @property
+    def pixel_size(self):
+        return self.background.surface.get_size()
+
+    @property
+    def neighbours(self):
+        return {item.data[0] for item in self.interactables if item.kind == 'door'}
+
+
+class RoomManager:
+    """LRU cache of built rooms with background prefetch of door neighbours.
+
+    ``enter(name)`` makes a room current and queues its neighbours on a
+    worker thread, so walking through a door only swaps a reference.  The
+    current room is never evicted.
+    """
+
+    def __init__(self, map_dir, tile_size, tiles, default=None, fill=(0, 0, 0),
+                 capacity=8, prefetch=True):
+        self.map_dir = map_dir
+        self.tile_size = tile_size
+        self.tiles = tiles
+        self.default = default
+        self.fill = fill
+        self.capacity = capacity
+        self.current = None
+        self._rooms = OrderedDict()
+        self._pending = {}
+        self._pool = ThreadPoolExecutor(1, thread_name_prefix='room-prefetch') if prefetch else None
+
+    def path(self, name):
+        return os.path.join(self.map_dir, name + '.map')
+
+    def _build(self, name):
+        data = load_map(self.path(name))
+        return Room(name, data, self.tile_size, self.tiles, self.default, self.fill)
+
+    def get(self, name):
+        room = self._rooms.get(name)
+        if room is not None:
+            self._rooms.move_to_end(name)
+            return room
+        future = self._pending.pop(name, None)
+        room = future.result() if future is not None else self._build(name)
+        self._store(name, room)
+        return room
+
+    def _store(self, name, room):
+        self._rooms[name] = room
+        self._rooms.move_to_end(name)
+        while len(self._rooms) > self.capacity:
+            victim = next((n for n, r in self._rooms.items() if r is not self.current), None)
+            if victim is None or victim == name:
+                break
+            del self._rooms[victim]
+
+    def prefetch(self, names):
+        if self._pool is None:
+            return
+        for name in names:
+            if name not in self._rooms and name not in self._pending:
+                self._pending[name] = self._pool.submit(self._build, name)
+
+    def enter(self, name):
+        self.current = self.get(name)
+        self.prefetch(self.current.neighbours)
+        return self.current
+
+    def reload(self, name):
+        """Rebuild a room after its map file changed; returns the current room.
+
+        Rooms that are cached or being prefetched are rebuilt straight
+        away, so a map that no longer parses raises here rather than when
+        the player next walks through a door.  On error the old room stays
+        cached (and current, if it was).
+        """
+        future = self._pending.pop(name, None)
+        if future is not None and not future.cancel():
+            wait([future])  # already compiling: let it finish rather than race on the cache file
+        if name not in self._rooms and future is None:
+            return self.current  # never built; it is read fresh when first entered
+        room = self._build(name)
+        if self.current is not None and self.current.name == name:
+            self.current = room
+        self._store(name, room)
+        return self.current
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
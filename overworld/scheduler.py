@@ -0,0 +1,230 @@
+"""Level-of-detail simulation for the rooms around the player.
+
+The room the player is in runs at the full tick rate in the game loop.
+Rooms within ``radius`` doors of it keep running at a reduced rate
+(``near_rate`` ticks per second).  Every other visited room is frozen, and
+when it comes back into range it is caught up in one go: timers are
+advanced arithmetically and NPCs walk along the room's flow field as far
+as they could have got.  The cost per tick depends on the rooms near the
+player, not on how many rooms exist.
+
+Rooms that were never visited have no state yet; they start from their
+map file the first time they are entered.
+
+Timers come from map entries (SECONDS may be fractional)::
+
+    timer: NAME SECONDS [repeat]
+"""
+from collections import deque
+
+import numpy as np
+
+from overworld.entities import EntityStore
+from overworld.flowfield import steer, walk
+
+
+class Timer:
+    """Countdown that fires once, or every ``period`` seconds if ``repeat``."""
+
+    __slots__ = ('name', 'period', 'remaining', 'repeat')
+
+    def __init__(self, name, period, repeat=False):
+        self.name = name
+        self.period = period
+        self.remaining = period
+        self.repeat = repeat
+
+    def advance(self, dt):
+        """Run the timer for ``dt`` seconds; returns how many times it fired."""
+        if self.remaining is None:
+            return 0
+        self.remaining -= dt
+        if self.remaining > 0:
+            return 0
+        if not self.repeat:
+            self.remaining = None
+            return 1
+        fires = 1 + int(-self.remaining // self.period)
+        self.remaining += fires * self.period
+        return fires
+
+
+def parse_timers(data):
+    timers = []
+    for value in data.get_all('timer'):
+        parts = value.split()
+        try:
+            if len(parts) not in (2, 3) or parts[2:] not in ([], ['repeat']):
+                raise ValueError
+            period = float(parts[1])
+            if period <= 0:
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"{data.path}: bad timer entry {value!r}") from None
+        timers.append(Timer(parts[0], period, len(parts) == 3))
+    return timers
+
+
+class RoomSim:
+    """Persistent state of one room: its crowd (while the player is elsewhere) and timers."""
+
+    def __init__(self, room, crowd_size, now):
+        self.room = room
+        self.crowd_size = crowd_size
+        self.actors = EntityStore()
+        self.timers = [Timer(t.name, t.period, t.repeat) for t in room.timers]
+        self.last = now  # world time this room was last simulated up to
+        ts = room.grid.tile_size
+        tiles, modes = room.crowd
+        self.actors.spawn_many(tiles * ts + (ts - crowd_size) / 2, (crowd_size, crowd_size), tag=modes)
+
+    def _crowd(self):
+        return np.flatnonzero(self.actors.alive)
+
+    def step(self, dt, speed):
+        """Simulate the crowd for ``dt`` seconds around the field's current goal."""
+        ids = self._crowd()
+        field = self.room.field
+        if len(ids) and field.goal is not None:
+            ts = self.room.grid.tile_size
+            target = ((field.goal[0] + 0.5) * ts, (field.goal[1] + 0.5) * ts)
+            self.actors.vel[ids] = steer(field, self.actors.centers(ids), self.actors.tag[ids],
+                                         speed, target)
+            self.actors.integrate(dt, self.room.grid)
+
+    def catch_up(self, elapsed, speed):
+        """Jump ``elapsed`` seconds ahead without stepping; returns fired timers."""
+        fired = [(t.name, n) for t in self.timers for n in (t.advance(elapsed),) if n]
+        ids = self._crowd()
+        field = self.room.field
+        if len(ids) and field.goal is not None:
+            ts = self.room.grid.tile_size
+            steps = min(elapsed * speed / ts, self.room.grid.width * self.room.grid.height)
+            centers = self.actors.centers(ids)
+            tiles = walk(field, centers // ts, self.actors.tag[ids], steps)
+            moved = (tiles != centers // ts).any(axis=1)
+            self.actors.pos[ids[moved]] = tiles[moved] * ts + (ts - self.actors.size[ids[moved]]) / 2
+            self.actors.prev[ids] = self.actors.pos[ids]
+            self.actors.vel[ids] = 0
+        return fired
+
+
+class WorldScheduler:
+    """Ticks visited rooms at a level of detail set by door distance from the player.
+
+    The current room's crowd lives in the game's own EntityStore; ``leave``
+    stores it back into the room's sim and ``enter`` hands the next room's
+    crowd out again.
+    """
+
+    def __init__(self, crowd_size, crowd_speed, near_rate=10, radius=1):
+        self.crowd_size = crowd_size
+        self.crowd_speed = crowd_speed
+        self.near_dt = 1.0 / near_rate
+        self.radius = radius
+        self.time = 0.0
+        self.current = None
+        self.near = []
+        self._sims = {}
+        self._near_acc = 0.0
+        self._fired = []  # timers that fired while catching a room up
+
+    def sim(self, room):
+        sim = self._sims.get(room.name)
+        if sim is None:
+            sim = self._sims[room.name] = RoomSim(room, self.crowd_size, self.time)
+        elif sim.room is not room:
+            sim.room = room  # rebuilt after dropping out of the room cache
+        return sim
+
+    def level(self, name):
+        """'current', 'near', 'frozen' or None (never visited)."""
+        if name == self.current:
+            return 'current'
+        if name in self.near:
+            return 'near'
+        return 'frozen' if name in self._sims else None
+
+    def _rooms_near(self, name):
+        seen = {name}
+        queue = deque([(name, 0)])
+        while queue:
+            room, hops = queue.popleft()
+            if hops == self.radius or room not in self._sims:
+                continue
+            for other in self._sims[room].room.neighbours:
+                if other not in seen:
+                    seen.add(other)
+                    queue.append((other, hops + 1))
+        return [n for n in seen if n != name and n in self._sims]
+
+    def _wake(self, sim):
+        fired = sim.catch_up(self.time - sim.last, self.crowd_speed)
+        sim.last = self.time
+        return [(sim.room.name, name, count) for name, count in fired]
+
+    def leave(self, actors, crowd):
+        """Take the current room's crowd back out of ``actors`` into its sim."""
+        if self.current is None:
+            return
+        sim = self._sims[self.current]
+        sim.actors.clear()
+        if len(crowd):
+            sim.actors.spawn_many(actors.pos[crowd], actors.size[crowd], tag=actors.tag[crowd])
+        sim.last = self.time
+        self.current = None
+
+    def enter(self, room, actors=None):
+        """Make ``room`` current and spawn its crowd into ``actors``; returns the new ids.
+
+        Rooms coming back into range are caught up first.  With no
+        ``actors`` the crowd is left where it is (for example when a save
+        is being loaded over it).
+        """
+        sim = self.sim(room)
+        self.current = room.name
+        self._fired += self._wake(sim)
+        self.near = self._rooms_near(room.name)
+        for name in self.near:
+            if self._sims[name].last < self.time:
+                self._fired += self._wake(self._sims[name])
+        if actors is None:
+            return None
+        ids = np.flatnonzero(sim.actors.alive)
+        if not len(ids):
+            return np.zeros(0, dtype=np.intp)
+        return actors.spawn_many(sim.actors.pos[ids], sim.actors.size[ids], tag=sim.actors.tag[ids])
+
+    def forget(self, name):
+        """Drop a room's state (e.g. after its map was edited); it restarts from the map."""
+        self._sims.pop(name, None)
+        if name in self.near:
+            self.near.remove(name)
+        if self.current == name:
+            self.current = None
+
+    def tick(self, dt):
+        """Advance world time by one game tick.
+
+        The current room's timers run every tick and nearby rooms step at
+        the reduced rate.  Returns ``(room, timer, times fired)`` triples.
+        """
+        self.time += dt
+        fired, self._fired = self._fired, []
+        if self.current is not None:
+            for timer in self._sims[self.current].timers:
+                n = timer.advance(dt)
+                if n:
+                    fired.append((self.current, timer.name, n))
+        self._near_acc += dt
+        if self._near_acc >= self.near_dt:
+            step, self._near_acc = self._near_acc, 0.0
+            for name in self.near:
+                sim = self._sims[name]
+                for timer in sim.timers:
+                    n = timer.advance(step)
+                    if n:
+                        fired.append((name, timer.name, n))
+                sim.step(step, self.crowd_speed)
+                sim.last = self.time
+        return fired
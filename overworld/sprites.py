@@ -0,0 +1,161 @@
+"""Animated sprites from a pre-sliced sheet driven by per-entity frame indices.
+
+A sheet is cut into frame surfaces (and mirrored copies) once at load.
+Animations are rows of frame numbers in a NumPy table, and each entity only
+carries an animation id, a clock and a flip bit.  Picking every entity's
+frame is one table lookup, and drawing is a single ``blits`` of surfaces
+that already exist, with no ``subsurface`` or ``transform`` per frame.
+
+Sheets used with ``walk_table`` have one row per facing (down, up, side)
+and ``walk_frames`` columns of walk cycle; column 0 doubles as the idle
+pose.  Left-facing frames are the mirrored side row.
+"""
+import numpy as np
+import pygame
+
+DOWN, UP, SIDE = 0, 1, 2
+FACINGS = ('down', 'up', 'side')
+
+
+class SpriteSheet:
+    """Frames of a sheet image, sliced once in row-major order."""
+
+    def __init__(self, image, frame_size, flip=True):
+        fw, fh = frame_size
+        cols, rows = image.get_width() // fw, image.get_height() // fh
+        self.frame_size = frame_size
+        self.columns = cols
+        self.frames = [
+            image.subsurface((c * fw, r * fh, fw, fh)).copy()
+            for r in range(rows) for c in range(cols)
+        ]
+        # Index 0 is the frames as drawn, index 1 mirrored left-right
+        self.variants = (self.frames, [pygame.transform.flip(f, True, False) for f in self.frames]
+                         if flip else self.frames)
+
+    @classmethod
+    def load(cls, path, frame_size, flip=True):
+        return cls(pygame.image.load(path).convert_alpha(), frame_size, flip)
+
+
+class FrameTable:
+    """Named animations as rows of sheet frame numbers, with a rate each.
+
+    ``animations`` maps a name to ``(frames, fps)``.
+    """
+
+    def __init__(self, animations):
+        self.names = list(animations)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        longest = max(len(frames) for frames, _ in animations.values())
+        self.frames = np.zeros((len(self.names), longest), dtype=np.int16)
+        self.length = np.zeros(len(self.names), dtype=np.int16)
+        self.fps = np.zeros(len(self.names), dtype=np.float32)
+        for i, (frames, fps) in enumerate(animations.values()):
+            self.frames[i, :len(frames)] = frames
+            self.length[i] = len(frames)
+            self.fps[i] = fps
+
+
+def walk_table(columns, walk_frames=4, fps=8):
+    """``idle_<facing>`` and ``walk_<facing>`` animations for a walk-cycle sheet."""
+    animations = {}
+    for row, facing in enumerate(FACINGS):
+        first = row * columns
+        animations['idle_' + facing] = ([first], 1)
+        animations['walk_' + facing] = (list(range(first, first + walk_frames)), fps)
+    return FrameTable(animations)
+
+
+def placeholder_sheet(size, color, walk_frames=4):
+    """Generated walk-cycle sheet (down, up, side rows) for when there is no art."""
+    w = h = size
+    sheet = pygame.Surface((w * walk_frames, h * 3), pygame.SRCALPHA)
+    dark = tuple(c // 2 for c in color)
+    for row in range(3):
+        for col in range(walk_frames):
+            x0, y0 = col * w, row * h
+            bob = (col % 2) * max(1, h // 16)
+            stride = (-1, 0, 1, 0)[col % 4] * max(1, w // 8)
+            body = pygame.Rect(x0 + w // 6, y0 + h // 8 + bob, w * 2 // 3, h * 5 // 8)
+            pygame.draw.ellipse(sheet, color, body)
+            foot = max(1, w // 6)
+            for side in (-1, 1):
+                fx = body.centerx + side * (w // 6 + stride)
+                pygame.draw.rect(sheet, dark, (fx - foot // 2, y0 + h - foot - 1, foot, foot))
+            eye = max(1, w // 10)
+            if row == DOWN:
+                for side in (-1, 1):
+                    pygame.draw.rect(sheet, (20, 20, 20), (body.centerx + side * w // 8 - eye // 2,
+                                                            body.y + h // 4, eye, eye))
+            elif row == SIDE:
+                pygame.draw.rect(sheet, (20, 20, 20), (body.right - w // 6, body.y + h // 4, eye, eye))
+    return sheet
+
+
+class Animator:
+    """Animation state per entity id: animation, clock and flip, as arrays."""
+
+    def __init__(self, table, capacity=64):
+        self.table = table
+        self.anim = np.zeros(capacity, dtype=np.int16)
+        self.time = np.zeros(capacity, dtype=np.float32)
+        self.flip = np.zeros(capacity, dtype=np.uint8)
+        self.facing = np.zeros(capacity, dtype=np.int8)
+        if all(f'{kind}_{f}' in table.ids for kind in ('walk', 'idle') for f in FACINGS):
+            self._walk = np.array([table.ids['walk_' + f] for f in FACINGS], dtype=np.int16)
+            self._idle = np.array([table.ids['idle_' + f] for f in FACINGS], dtype=np.int16)
+
+    def _fit(self, ids):
+        need = int(np.max(ids, initial=-1)) + 1
+        if need > len(self.anim):
+            new = max(need, 2 * len(self.anim))
+            for name in ('anim', 'time', 'flip', 'facing'):
+                arr = getattr(self, name)
+                grown = np.zeros(new, dtype=arr.dtype)
+                grown[:len(arr)] = arr
+                setattr(self, name, grown)
+
+    def play(self, ids, anim):
+        """Switch ``ids`` to ``anim`` (ids or names), restarting only those that change."""
+        ids = np.atleast_1d(ids)
+        self._fit(ids)
+        if isinstance(anim, str):
+            anim = self.table.ids[anim]
+        anim = np.broadcast_to(np.asarray(anim, dtype=np.int16), ids.shape)
+        restart = self.anim[ids] != anim
+        self.time[ids[restart]] = 0
+        self.anim[ids] = anim
+
+    def face(self, ids, vel):
+        """Pick walk/idle animations and facing for ``ids`` from velocities (``walk_table`` only)."""
+        ids = np.atleast_1d(ids)
+        self._fit(ids)
+        vel = np.asarray(vel).reshape(-1, 2)
+        vx, vy = vel[:, 0], vel[:, 1]
+        moving = (vx != 0) | (vy != 0)
+        facing = np.where(np.abs(vx) > np.abs(vy), SIDE, np.where(vy < 0, UP, DOWN))
+        facing = np.where(moving, facing, self.facing[ids])
+        self.facing[ids] = facing
+        self.flip[ids] = np.where(moving, (facing == SIDE) & (vx < 0), self.flip[ids])
+        self.play(ids, np.where(moving, self._walk[facing], self._idle[facing]))
+
+    def update(self, dt):
+        self.time += dt
+
+    def frames(self, ids):
+        """Current sheet frame number of each of ``ids``."""
+        anim = self.anim[ids]
+        t = self.table
+        step = (self.time[ids] * t.fps[anim]).astype(np.intp) % t.length[anim]
+        return t.frames[anim, step]
+
+    def blit_list(self, sheet, ids, positions):
+        """``(surface, dest)`` pairs for ``Surface.blits``; ``positions`` are screen top-lefts."""
+        ids = np.atleast_1d(ids)
+        variants = sheet.variants
+        return [
+            (variants[flip][frame], dest)
+            for frame, flip, dest in zip(self.frames(ids).tolist(), self.flip[ids].tolist(),
+                                          np.asarray(positions).reshape(-1, 2).astype(int).tolist())
+        ]
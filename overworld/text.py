@@ -0,0 +1,180 @@
+"""Text for the overworld: font lookup, rendered-line cache and dialogue boxes.
+
+``pygame.font.SysFont`` scans every installed font on each start-up.
+``load_font`` asks for the scan only the first time a name is seen and
+remembers the resolved file in ``fonts.json`` under the user cache
+directory.  Rendered lines are memoized in an LRU keyed by font, text and
+colour, and a dialogue box reveals text typewriter-style by widening the
+visible part of each cached line, so a box costs one blit per line per
+frame however long it is.
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+
+import pygame
+
+MISS_TTL = 24 * 60 * 60  # seconds before a font that was not found is looked up again
+
+
+def font_cache_path():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'overworld', 'fonts.json')
+
+
+def find_font(name, cache_file=None):
+    """Path of the system font ``name``, or None for pygame's default font.
+
+    Hits are persisted so the system font scan only runs for names that
+    have never been found, or whose file has gone.  Misses are remembered
+    with the time of the scan and retried after ``MISS_TTL`` seconds, so a
+    font installed later is picked up.
+    """
+    cache_file = cache_file or font_cache_path()
+    try:
+        with open(cache_file) as f:
+            known = json.load(f)
+    except (OSError, ValueError):
+        known = {}
+    key = name.lower()
+    entry = known.get(key)
+    if isinstance(entry, str) and os.path.exists(entry):
+        return entry
+    if isinstance(entry, (int, float)) and 0 <= time.time() - entry < MISS_TTL:
+        return None
+    path = pygame.font.match_font(name)
+    known[key] = path if path is not None else time.time()  # misses store when they were checked
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp = cache_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(known, f, indent=1)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass  # read-only home: just scan again next time
+    return path
+
+
+def load_font(name, size, cache_file=None):
+    """Drop-in for ``pygame.font.SysFont(name, size)`` using ``find_font``."""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(find_font(name, cache_file), size)
+
+
+class TextCache:
+    """LRU of rendered text surfaces keyed by (font, text, colour, antialias)."""
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surf = self._surfaces.get(key)
+        if surf is None:
+            surf = font.render(text, antialias, color)
+            self._surfaces[key] = surf
+            if len(self._surfaces) > self.capacity:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surf
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+def wrap(font, text, width):
+    """Split ``text`` into lines no wider than ``width`` pixels (on word breaks)."""
+    lines = []
+    for para in text.split('\n'):
+        line = ''
+        for word in para.split(' '):
+            trial = f"{line} {word}" if line else word
+            if line and font.size(trial)[0] > width:
+                lines.append(line)
+                line = word
+            else:
+                line = trial
+        lines.append(line)
+    return lines
+
+
+class DialogueBox:
+    """Typewriter-style message box drawn through a DirtyRenderer.
+
+    ``show(text)`` wraps the text to ``rect`` and reveals it at
+    ``chars_per_second``; the box closes ``hold`` seconds after the last
+    character appears.  Each line is rendered once (through ``cache``)
+    and the reveal only changes how much of it is blitted.
+    """
+
+    def __init__(self, font, rect, cache=None, color=(255, 255, 255), background=None,
+                 chars_per_second=40, hold=2.0):
+        self.font = font
+        self.rect = pygame.Rect(rect)
+        self.cache = cache or TextCache()
+        self.color = color
+        self.background = background
+        self.chars_per_second = chars_per_second
+        self.hold = hold
+        self.text = None
+        self._lines = []  # (surface, cumulative prefix widths)
+        self._total = 0
+        self._shown = 0.0
+        self._timer = 0.0
+
+    @property
+    def open(self):
+        return self.text is not None
+
+    @property
+    def done(self):
+        return self._shown >= self._total
+
+    def show(self, text):
+        self.text = text
+        self._lines = []
+        for line in wrap(self.font, text, self.rect.width):
+            surf = self.cache.render(self.font, line, self.color)
+            widths = [self.font.size(line[:n])[0] for n in range(len(line) + 1)]
+            self._lines.append((surf, widths))
+        self._total = sum(len(widths) - 1 for _, widths in self._lines)
+        self._shown = 0.0
+        self._timer = self.hold
+
+    def skip(self):
+        """Reveal the rest of the text at once."""
+        self._shown = self._total
+
+    def close(self):
+        self.text = None
+        self._lines = []
+
+    def update(self, dt):
+        if not self.open:
+            return
+        if not self.done:
+            self._shown = min(self._total, self._shown + dt * self.chars_per_second)
+        else:
+            self._timer -= dt
+            if self._timer <= 0:
+                self.close()
+
+    def draw(self, renderer):
+        if not self.open:
+            return
+        if self.background is not None:
+            renderer.fill(self.background, self.rect)
+        left = int(self._shown)
+        y = self.rect.y
+        for surf, widths in self._lines:
+            if left <= 0:
+                break
+            chars = min(left, len(widths) - 1)
+            left -= chars
+            width = surf.get_width() if chars == len(widths) - 1 else widths[chars]
+            renderer.blit(surf, (self.rect.x, y), (0, 0, width, surf.get_height()))
+            y += self.font.get_linesize()
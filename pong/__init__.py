@@ -0,0 +1 @@
+"""Shared building blocks for the Pong script (PongCLAUDE3.7-Gemini5.21.25.py)."""
@@ -0,0 +1,193 @@
+"""Pong rules as a plain state object and a step function, without pygame.
+
+``game_loop`` used to move ``pygame.Rect`` objects around and play sounds
+in the middle of the physics.  Here the same rules run on integers:
+positions are stored the way a Rect stores them, and every assignment
+rounds half away from zero as Rect's setters do, so a game stepped here
+plays out exactly like the original.  ``step`` returns the events of the
+frame (hits, bounces, scores) and leaves sound, printing and drawing to
+the caller.
+
+Run ``python -m pong.sim`` for a headless throughput check.
+"""
+import random
+
+WALL, PLAYER_HIT, AI_HIT, PLAYER_SCORE, AI_SCORE, GAME_OVER = (
+    'wall', 'player_hit', 'ai_hit', 'player_score', 'ai_score', 'game_over')
+
+
+def _rect_int(v):
+    """Rect's conversion of an assigned coordinate (rounds half away from zero)."""
+    return int(v + 0.5) if v >= 0 else int(v - 0.5)
+
+
+class Paddle:
+    __slots__ = ('x', 'y', 'width', 'height')
+
+    def __init__(self, x, y, width, height):
+        self.x, self.y, self.width, self.height = x, y, width, height
+
+    @property
+    def centery(self):
+        return self.y + self.height // 2
+
+    def clamp(self, height):
+        if self.y < 0:
+            self.y = 0
+        if self.y + self.height > height:
+            self.y = height - self.height
+
+
+class PongState:
+    """Ball, paddles, scores and the random source of one game.
+
+    Defaults are the retro Pong script's settings.  ``rng`` is anything
+    with ``choice`` (a ``random.Random``, or the ``random`` module itself).
+    """
+
+    def __init__(self, width=640, height=480, paddle_size=(15, 100), paddle_margin=30,
+                 ai_speed=7, ball_size=15, ball_speed=(5, 5), winning_score=5, rng=None,
+                 seed=None):
+        self.width = width
+        self.height = height
+        self.ai_speed = ai_speed
+        self.winning_score = winning_score
+        self.rng = rng if rng is not None else random.Random(seed)
+        pw, ph = paddle_size
+        self.player = Paddle(paddle_margin, height // 2 - ph // 2, pw, ph)
+        self.ai = Paddle(width - paddle_margin - pw, height // 2 - ph // 2, pw, ph)
+        self.ball_size = ball_size
+        self.ball_x = width // 2 - ball_size // 2
+        self.ball_y = height // 2 - ball_size // 2
+        self.speed_abs_x, self.speed_abs_y = abs(ball_speed[0]), abs(ball_speed[1])
+        self.speed_x = self.speed_abs_x * self.rng.choice([-1, 1])
+        self.speed_y = self.speed_abs_y * self.rng.choice([-1, 1])
+        self.player_score = 0
+        self.ai_score = 0
+        self.game_over = False
+        self.winner = None  # 'player' or 'ai' once the game is over
+        self.steps = 0
+
+    def ball_rect(self):
+        return (self.ball_x, self.ball_y, self.ball_size, self.ball_size)
+
+    def reset_ball(self, direction):
+        """Serve from the centre towards ``direction`` (1 right, -1 left), 5% faster next time."""
+        self.ball_x = self.width // 2 - self.ball_size // 2
+        self.ball_y = self.height // 2 - self.ball_size // 2
+        self.speed_y = self.speed_abs_y * self.rng.choice([-1, 1])
+        self.speed_x = self.speed_abs_x * direction
+        self.speed_abs_x = min(self.speed_abs_x * 1.05, 15)
+        self.speed_abs_y = min(self.speed_abs_y * 1.05, 15)
+
+
+def _overlaps(state, paddle):
+    size = state.ball_size
+    return (state.ball_x < paddle.x + paddle.width and paddle.x < state.ball_x + size
+            and state.ball_y < paddle.y + paddle.height and paddle.y < state.ball_y + size)
+
+
+def _deflect(state, paddle):
+    """Bounce off ``paddle``, angled by where the ball struck it."""
+    state.speed_x *= -1
+    delta = state.ball_y + state.ball_size // 2 - paddle.centery
+    limit = abs(state.speed_abs_y * 1.8)
+    speed_y = max(-limit, min(delta * 0.25, limit))
+    if abs(speed_y) < 1 and speed_y != 0:
+        speed_y = 1 if speed_y > 0 else -1
+    state.speed_y = speed_y
+
+
+def _score(state, scorer, direction, events):
+    if scorer == 'player':
+        state.player_score += 1
+        total = state.player_score
+        events.append(PLAYER_SCORE)
+    else:
+        state.ai_score += 1
+        total = state.ai_score
+        events.append(AI_SCORE)
+    if total >= state.winning_score:
+        state.game_over = True
+        state.winner = scorer
+        events.append(GAME_OVER)
+    else:
+        state.reset_ball(direction)
+
+
+def step(state, player_y=None):
+    """Advance one frame; returns the frame's events in the order they happened.
+
+    ``player_y`` is where the player wants the centre of their paddle
+    (the mouse y), or None to leave it where it is.  A finished game
+    does not change.
+    """
+    events = []
+    if state.game_over:
+        return events
+    state.steps += 1
+    height, size = state.height, state.ball_size
+    player, ai = state.player, state.ai
+    if player_y is not None:
+        player.y = _rect_int(player_y) - player.height // 2
+        player.clamp(height)
+
+    state.ball_x = _rect_int(state.ball_x + state.speed_x)
+    state.ball_y = _rect_int(state.ball_y + state.speed_y)
+    if state.ball_y <= 0 or state.ball_y + size >= height:
+        state.speed_y *= -1
+        events.append(WALL)
+        # Nudge off the wall so the ball cannot stick to it
+        if state.ball_y < 0:
+            state.ball_y = 1
+        if state.ball_y + size > height:
+            state.ball_y = height - 1 - size
+
+    ball_centery = state.ball_y + size // 2
+    if ai.centery < ball_centery:
+        ai.y += state.ai_speed
+    if ai.centery > ball_centery:
+        ai.y -= state.ai_speed
+    ai.clamp(height)
+
+    if _overlaps(state, player):
+        _deflect(state, player)
+        state.ball_x = player.x + player.width + 1
+        events.append(PLAYER_HIT)
+    elif _overlaps(state, ai):
+        _deflect(state, ai)
+        state.ball_x = ai.x - 1 - size
+        events.append(AI_HIT)
+
+    if state.ball_x <= 0:
+        _score(state, 'ai', 1, events)
+    elif state.ball_x + size >= state.width:
+        _score(state, 'player', -1, events)
+    return events
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Step headless Pong games and report steps per second.")
+    parser.add_argument('--steps', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    state = PongState(rng=rng)
+    games = 1
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        # A player who jumps somewhere random now and then, so points are won and lost
+        step(state, rng.randrange(state.height) if state.steps % 30 == 0 else None)
+        if state.game_over:
+            state = PongState(rng=rng)
+            games += 1
+    elapsed = time.perf_counter() - start
+    print(f"{args.steps} steps, {games} games in {elapsed:.2f}s: {args.steps / elapsed:,.0f} steps/s")
+
+
+if __name__ == '__main__':
+    main()
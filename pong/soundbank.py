@@ -0,0 +1,178 @@
+"""Rendered sound effects cached on disk and loaded on first play.
+
+Synthesising every effect before the window opens is wasted work on all
+but the first launch.  ``SoundBank`` keys each voice by its parameters and
+the mixer format, appends rendered PCM to one cache file under the user
+cache directory and reads it back through ``mmap``.  The sounds it hands out
+are ``LazySound`` objects.  Nothing is read or synthesised until one is
+first played, and on later runs nothing is synthesised at all.
+
+The file is ``MAGIC`` followed by a sequence of records::
+
+    record  key (16-byte BLAKE2b digest), sample bytes (uint32), PCM
+
+A record cut short by a crash mid-write is dropped when the bank opens,
+and a file without the magic is emptied and started again.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import warnings
+
+import pygame
+
+from pong.synth import render
+
+MAGIC = b'PSB1'
+RECORD = struct.Struct('<16sI')
+S16 = (-16, 16)  # pygame reports signed 16-bit as -16 (or 16 on some builds)
+
+
+def bank_cache_path():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pong', 'sounds.bank')
+
+
+def sound_key(voice, mixer):
+    """Digest of a voice's parameters and the ``(rate, format, channels)`` it is rendered for."""
+    return hashlib.blake2b(repr((voice.key(), mixer)).encode(), digest_size=16).digest()
+
+
+class Silence:
+    """Does nothing when played; stands in for a sound that could not be made."""
+
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+
+class LazySound:
+    """Stands in for a ``pygame.mixer.Sound`` until it is first played.
+
+    If the bank cannot produce the sound (no mixer, unreadable cache, a
+    synthesis error) the bank is disabled and ``fallback`` plays instead,
+    or nothing if there is none.  Playing never raises.
+    """
+
+    __slots__ = ('bank', 'voice', 'fallback', 'sound')
+
+    def __init__(self, bank, voice, fallback=None):
+        self.bank = bank
+        self.voice = voice
+        self.fallback = fallback
+        self.sound = None
+
+    def load(self):
+        if self.sound is None:
+            if self.bank.error is None:
+                try:
+                    self.sound = self.bank.load(self.voice)
+                except (pygame.error, OSError, ValueError) as e:
+                    self.bank.disable(e)
+            if self.sound is None:
+                self.sound = self.fallback if self.fallback is not None else Silence()
+        return self.sound
+
+    def play(self, *args, **kwargs):
+        return self.load().play(*args, **kwargs)
+
+    def stop(self):
+        if self.sound is not None:
+            self.sound.stop()
+
+
+class SoundBank:
+    """Voices rendered once and kept in a memory-mapped cache file.
+
+    The mixer must be initialised before the first ``load``.  If the
+    cache file cannot be written (read-only home) sounds are synthesised
+    every run, as if there were no cache.  Any other failure disables the
+    bank (see ``LazySound``) and records it in ``error``.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or bank_cache_path()
+        self.error = None  # why the bank was disabled, if it was
+        self._map = None
+        self._index = None  # key -> (offset, length) in the file
+
+    def _open(self):
+        self._index = {}
+        self._map = None
+        try:
+            f = open(self.path, 'r+b')
+        except OSError:
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(MAGIC) or f.read(len(MAGIC)) != MAGIC:
+                f.truncate(0)  # not a bank (or its header was cut short); start afresh
+                return
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        offset = len(MAGIC)
+        while offset + RECORD.size <= size:
+            key, length = RECORD.unpack_from(self._map, offset)
+            if offset + RECORD.size + length > size:
+                break
+            self._index[key] = (offset + RECORD.size, length)
+            offset += RECORD.size + length
+        if offset != size:
+            self._truncate(offset)
+
+    def _truncate(self, size):
+        self._map.close()
+        try:
+            with open(self.path, 'r+b') as f:
+                f.truncate(size)
+        except OSError:
+            pass
+        self._open()
+
+    def _append(self, key, pcm):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'ab') as f:
+                if f.tell() == 0:
+                    f.write(MAGIC)
+                f.write(RECORD.pack(key, len(pcm)) + pcm)
+        except OSError:
+            return
+        if self._map is not None:
+            self._map.close()
+        self._open()
+
+    def load(self, voice):
+        """A ``pygame.mixer.Sound`` of ``voice``, from the cache if it is there."""
+        mixer = pygame.mixer.get_init()
+        if mixer is None:
+            raise pygame.error("mixer not initialized")
+        rate, fmt, channels = mixer
+        if fmt not in S16:
+            return pygame.sndarray.make_sound(render(voice, rate, channels))
+        if self._index is None:
+            self._open()
+        key = sound_key(voice, mixer)
+        entry = self._index.get(key)
+        if entry is None:
+            pcm = render(voice, rate, channels).tobytes()
+            self._append(key, pcm)
+            return pygame.mixer.Sound(buffer=pcm)
+        offset, length = entry
+        return pygame.mixer.Sound(buffer=self._map[offset:offset + length])
+
+    def sound(self, voice, fallback=None):
+        return LazySound(self, voice, fallback)
+
+    def disable(self, error):
+        """Stop using the bank after ``error``; its sounds fall back from now on."""
+        if self.error is None:
+            self.error = error
+            warnings.warn(f"sound bank disabled: {error}", RuntimeWarning, stacklevel=4)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._map = self._index = None
@@ -0,0 +1,48 @@
+"""Cached fonts and rendered text for Pong's score and game-over screens.
+
+Opening a ``pygame.font.Font`` reads the font file from disk, and Pong
+draws the same handful of strings every frame.  ``TextRenderer`` opens each
+(font, size) once and keeps rendered surfaces in an LRU keyed by text, font,
+size and colour, so a score is only rendered again when it changes.
+"""
+from collections import OrderedDict
+
+import pygame
+
+
+class TextRenderer:
+    """One Font per (name, size) and an LRU of rendered surfaces."""
+
+    def __init__(self, capacity=64, antialias=True):
+        self.capacity = capacity
+        self.antialias = antialias
+        self._fonts = {}
+        self._surfaces = OrderedDict()
+
+    def font(self, size, name=None):
+        font = self._fonts.get((name, size))
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self._fonts[(name, size)] = pygame.font.Font(name, size)
+        return font
+
+    def render(self, text, size, color, name=None):
+        key = (text, size, tuple(color), name)
+        surf = self._surfaces.get(key)
+        if surf is None:
+            surf = self.font(size, name).render(text, self.antialias, color)
+            self._surfaces[key] = surf
+            if len(self._surfaces) > self.capacity:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surf
+
+    def draw(self, screen, text, size, center, color, name=None):
+        """Blit ``text`` centred on ``center``; returns the Rect drawn."""
+        surf = self.render(text, size, color, name)
+        return screen.blit(surf, surf.get_rect(center=center))
+
+    def clear(self):
+        self._surfaces.clear()